@@ -2,15 +2,26 @@ from __future__ import annotations
 
 import json
 import shutil
-from dataclasses import dataclass
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, ContextManager
 
-from .certora import run_certora, summarize_feedback
+from .artifacts import ArtifactStore, archive_iteration
+from .certora import CertoraResult, run_certora, summarize_feedback
+from .compile_cache import CompileCache, read_stats
 from .config import HarnessConfig
 from .context_builder import collect_context, render_context
-from .llm import BaseLLMClient, LLMError
+from .convergence import ProgressObservation, ProgressTracker, observe_parse_error, observe_result
+from .corpus import CorpusManifest
+from .cvl import spec_fingerprint
+from .llm import BaseLLMClient, LLMError, LLMParseError, LLMResponse, payload_problems, response_schema
+from .prover_pool import ProverPool, get_pool
+from .retrieval import SpecIndex, render_seed_specs
+from .slots import FairSlots
 
 
 @dataclass
@@ -22,6 +33,17 @@ class IterationResult:
     certora_exit_code: int
     certora_reason: str
     elapsed_sec: float
+    compile_cache_hits: int = 0
+    compile_cache_misses: int = 0
+    spec_hash: str = ""
+    repeat_of: int | None = None
+    prover_skipped: bool = False
+    llm_repairs: list[str] = field(default_factory=list)
+    llm_reasks: int = 0
+    llm_sec: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    llm_warnings: list[str] = field(default_factory=list)
 
 
 class HarnessRunner:
@@ -31,16 +53,73 @@ class HarnessRunner:
         llm_client: BaseLLMClient,
         dry_run: bool = False,
         max_iterations_override: int | None = None,
+        run_label: str | None = None,
+        spec_results: dict[tuple[str, str, str, str], CertoraResult] | None = None,
+        spec_locks: dict[tuple[str, str, str, str], threading.Lock] | None = None,
+        context_cache: dict[tuple[Any, ...], str] | None = None,
+        prover_slots: FairSlots | None = None,
+        spec_index: SpecIndex | None = None,
+        observer: Callable[[str, dict[str, Any]], None] | None = None,
     ):
         self.config = config
         self.llm_client = llm_client
         self.dry_run = dry_run
         self.max_iterations = max_iterations_override or config.max_iterations
+        self.run_label = run_label
+        self.context_cache = context_cache if context_cache is not None else {}
+        self.prover_slots = prover_slots
+        self.spec_index = spec_index
+        self._corpus: CorpusManifest | None = None
+        self._corpus_refreshed = False
+        self.observer = observer
+        if self.spec_index is None and config.retrieval.enabled and config.retrieval.index_path is not None:
+            self.spec_index = SpecIndex(config.retrieval.index_path, config.output_dir)
+        self.artifact_store: ArtifactStore | None = None
+        if config.artifacts.enabled and config.artifacts.store_dir is not None:
+            self.artifact_store = ArtifactStore(
+                config.artifacts.store_dir,
+                compression=config.artifacts.compression,
+            )
+        self.compile_cache: CompileCache | None = None
+        if config.compile_cache.enabled and config.compile_cache.cache_dir is not None:
+            self.compile_cache = CompileCache(
+                config.compile_cache.cache_dir,
+                solc_names=config.compile_cache.solc_names,
+            )
+        # Prover results keyed on (challenge, spec path, command, normalized spec hash).
+        self.spec_results = spec_results if spec_results is not None else {}
+        # One lock per key, so runners sharing spec_results wait for an in-flight run of the same spec.
+        self.spec_locks = spec_locks if spec_locks is not None else {}
+        self.prover_pool: ProverPool | None = None
+        if config.certora.executor == "warm-pool" and not dry_run:
+            self.prover_pool = get_pool(
+                size=config.certora.pool_size,
+                max_jobs_per_worker=config.certora.pool_max_jobs,
+                setup_command=config.certora.pool_setup_command,
+                preload=config.certora.pool_preload,
+            )
+            self.prover_pool.warm_up_async()
+
+    def _loaded_corpus(self) -> CorpusManifest:
+        if self._corpus is None:
+            manifest_path = self.config.corpus.manifest_path or self.config.output_dir / ".corpus.json"
+            self._corpus = CorpusManifest(manifest_path, self.config.challenge_root, self.config.challenge_glob)
+        return self._corpus
+
+    def corpus_manifest(self, refresh: bool = False) -> CorpusManifest:
+        corpus = self._loaded_corpus()
+        if refresh or not self._corpus_refreshed:
+            corpus.refresh(full=refresh)
+            self._corpus_refreshed = True
+        return corpus
 
     def discover_challenges(
         self,
         specific_challenge: Path | None = None,
         limit: int | None = None,
+        sort: str | None = None,
+        min_bytes: int | None = None,
+        refresh: bool = False,
     ) -> list[Path]:
         if specific_challenge is not None:
             candidate = self._resolve_challenge_path(specific_challenge)
@@ -48,6 +127,14 @@ class HarnessRunner:
                 return []
             return [candidate]
 
+        if self.config.corpus.enabled or sort or min_bytes or refresh:
+            records = self.corpus_manifest(refresh=refresh).select(
+                sort=sort or self.config.corpus.sort,
+                min_bytes=self.config.corpus.min_bytes if min_bytes is None else min_bytes,
+                limit=limit,
+            )
+            return [Path(record.path) for record in records]
+
         matches = [
             path
             for path in sorted(self.config.challenge_root.glob(self.config.challenge_glob))
@@ -61,8 +148,19 @@ class HarnessRunner:
         self,
         specific_challenge: Path | None = None,
         limit: int | None = 1,
+        sort: str | None = None,
+        min_bytes: int | None = None,
+        refresh: bool = False,
     ) -> list[dict[str, Any]]:
-        challenges = self.discover_challenges(specific_challenge=specific_challenge, limit=limit)
+        challenges = self.discover_challenges(
+            specific_challenge=specific_challenge,
+            limit=limit,
+            sort=sort,
+            min_bytes=min_bytes,
+            refresh=refresh,
+        )
+        if self.observer is not None:
+            self.observer("run_start", {"total": len(challenges)})
         results: list[dict[str, Any]] = []
         for challenge_dir in challenges:
             results.append(self._run_single(challenge_dir))
@@ -70,6 +168,13 @@ class HarnessRunner:
 
     def _resolve_challenge_path(self, path: Path) -> Path:
         expanded = path.expanduser()
+        if self.config.corpus.enabled and not expanded.is_absolute():
+            # Challenge ids and names resolve from the manifest as stored; refreshing it here
+            # would scan the whole corpus to find one challenge. Misses fall through to probing.
+            record = self._loaded_corpus().lookup(str(expanded))
+            if record is not None and Path(record.path).is_dir():
+                return Path(record.path)
+
         if expanded.is_absolute() and expanded.exists():
             return expanded.resolve()
 
@@ -83,6 +188,75 @@ class HarnessRunner:
 
         return expanded.resolve()
 
+    def _prepare_workspace(self, challenge_dir: Path, iter_dir: Path) -> Path:
+        workspace_dir = iter_dir / "workspace"
+        shutil.copytree(challenge_dir, workspace_dir)
+
+        # Remove stale Certora artifacts copied from source challenge folders.
+        stale_internal = workspace_dir / ".certora_internal"
+        if stale_internal.exists():
+            shutil.rmtree(stale_internal, ignore_errors=True)
+        for stale_report in workspace_dir.glob("emv-*"):
+            if stale_report.is_dir():
+                shutil.rmtree(stale_report, ignore_errors=True)
+        return workspace_dir
+
+    def _context_text(self, challenge_dir: Path) -> str:
+        key = (
+            str(challenge_dir.resolve()),
+            tuple(self.config.context_globs),
+            self.config.max_context_files,
+            self.config.max_context_bytes,
+        )
+        cached = self.context_cache.get(key)
+        if cached is not None:
+            return cached
+
+        context_files = collect_context(
+            challenge_dir=challenge_dir,
+            globs=self.config.context_globs,
+            max_files=self.config.max_context_files,
+            max_total_bytes=self.config.max_context_bytes,
+        )
+        context_text = render_context(context_files)
+        self.context_cache[key] = context_text
+        return context_text
+
+    def _seed_specs(self, challenge_dir: Path) -> tuple[str, list[dict[str, Any]]]:
+        if self.spec_index is None:
+            return "", []
+        self.spec_index.ensure_refreshed()
+        matches = self.spec_index.query(
+            challenge_dir,
+            top_k=self.config.retrieval.top_k,
+            min_score=self.config.retrieval.min_score,
+            exclude_same_challenge=self.config.retrieval.exclude_same_challenge,
+        )
+        seeds = [
+            {
+                "challenge": match.entry.challenge,
+                "run_dir": match.entry.run_dir,
+                "iteration": match.entry.iteration,
+                "outcome": match.entry.outcome,
+                "score": round(match.score, 4),
+            }
+            for match in matches
+        ]
+        return render_seed_specs(matches, self.config.retrieval.max_spec_chars), seeds
+
+    def _notify(self, event: str, challenge_dir: Path, **data: Any) -> None:
+        if self.observer is not None:
+            self.observer(event, {"challenge": challenge_dir.name, "label": self.run_label, **data})
+
+    def _prover_slot(self) -> ContextManager[None]:
+        if self.prover_slots is None:
+            return nullcontext()
+        return self.prover_slots.acquire(self.run_label or "default")
+
+    def _spec_lock(self, cache_key: tuple[str, str, str, str]) -> threading.Lock:
+        # setdefault is atomic, so concurrent callers always end up with the same lock.
+        return self.spec_locks.setdefault(cache_key, threading.Lock())
+
     def _load_system_prompt(self) -> str:
         if self.config.system_prompt_path and self.config.system_prompt_path.exists():
             return self.config.system_prompt_path.read_text(encoding="utf-8")
@@ -98,9 +272,17 @@ class HarnessRunner:
         feedback_history: list[str],
         previous_spec: str,
         iteration: int,
+        seed_specs: str = "",
     ) -> str:
         feedback_text = "\n\n".join(feedback_history[-3:]) if feedback_history else "none"
         previous_spec_text = previous_spec if previous_spec else "none"
+        seed_text = ""
+        if seed_specs and not previous_spec:
+            seed_text = (
+                "Reference specs that verified or exposed violations on similar contracts "
+                "(adapt names and properties to this challenge; do not copy blindly):\n"
+                f"{seed_specs}\n"
+            )
 
         schema = (
             "{\n"
@@ -122,144 +304,335 @@ class HarnessRunner:
             "- If previous feedback includes parse/type issues, prioritize fixing them.\n"
             "- Preserve exploit-relevant failing properties if they are legitimate.\n"
             "- Return JSON only (no markdown fences).\n\n"
+            f"{seed_text}"
             f"Previous spec:\n{previous_spec_text}\n\n"
             f"Recent Certora feedback:\n{feedback_text}\n\n"
             f"Context files:\n{context_text}\n"
         )
 
+    def _build_reask_prompt(self, problems: dict[str, str], raw_text: str) -> str:
+        fields = ", ".join(f"`{name}` ({problem})" for name, problem in problems.items())
+        excerpt = raw_text if len(raw_text) <= 12000 else f"{raw_text[:12000]}\n... (truncated)"
+        return (
+            f"Your previous response could not be used. Problems: {fields}.\n\n"
+            f"Previous response:\n{excerpt}\n\n"
+            "Return a JSON object containing only the listed keys, with corrected values. "
+            "Keep the spec complete but concise so it fits in one response. JSON only.\n"
+        )
+
+    def _request_spec(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        iter_dir: Path,
+        llm_kwargs: dict[str, Any],
+    ) -> tuple[LLMResponse, int]:
+        try:
+            response = self.llm_client.complete_json(
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                **llm_kwargs,
+            )
+            payload, raw_text = dict(response.payload), response.raw_text
+            repairs = list(response.repairs)
+            usage = dict(response.usage)
+            warnings = list(response.warnings)
+            problems = payload_problems(payload, repairs)
+        except LLMParseError as exc:
+            payload, raw_text, repairs, usage, warnings = {}, exc.raw_text, [], {}, []
+            problems = {"spec": str(exc)}
+        _write_text(iter_dir / "llm_raw.txt", raw_text)
+
+        # Re-ask only for the broken fields, without the context files, so a malformed
+        # response costs one short completion instead of a prover run or the challenge.
+        reasks = 0
+        while problems and reasks < self.config.llm.reask_attempts:
+            reasks += 1
+            try:
+                fix = self.llm_client.complete_json(
+                    system_prompt=system_prompt,
+                    user_prompt=self._build_reask_prompt(problems, raw_text),
+                    # Constrain the reply to the broken fields so the model does not have to
+                    # regenerate (and pay for) fields that were already fine.
+                    schema=response_schema(list(problems)),
+                    **llm_kwargs,
+                )
+            except LLMParseError as exc:
+                _write_text(iter_dir / f"llm_reask_{reasks}.txt", exc.raw_text)
+                continue
+            _write_text(iter_dir / f"llm_reask_{reasks}.txt", fix.raw_text)
+            fix_problems = payload_problems(fix.payload, fix.repairs)
+            for name in list(problems):
+                if name in fix.payload and name not in fix_problems:
+                    payload[name] = fix.payload[name]
+                    del problems[name]
+            repairs.extend(fix.repairs)
+            warnings.extend(item for item in fix.warnings if item not in warnings)
+            for key, value in fix.usage.items():
+                usage[key] = usage.get(key, 0) + value
+
+        if problems:
+            details = "; ".join(f"{name}: {problem}" for name, problem in problems.items())
+            raise LLMParseError(f"Unusable model response after {reasks} re-ask(s): {details}", raw_text)
+        response = LLMResponse(
+            payload=payload,
+            raw_text=raw_text,
+            repairs=sorted(set(repairs)),
+            usage=usage,
+            warnings=warnings,
+        )
+        return response, reasks
+
+    def _progress_action(
+        self,
+        tracker: ProgressTracker | None,
+        observation: ProgressObservation,
+        escalations: int,
+        progress_events: list[dict[str, Any]],
+    ) -> str | None:
+        if tracker is None:
+            return None
+        event = tracker.observe(observation)
+        if event is None:
+            return None
+        convergence = self.config.convergence
+        action = "stop" if convergence.action == "stop" or escalations >= convergence.max_escalations else "escalate"
+        progress_events.append({"iteration": observation.index, "event": event, "action": action})
+        if action == "escalate":
+            tracker.reset()
+        return action
+
     def _run_single(self, challenge_dir: Path) -> dict[str, Any]:
         now = datetime.now(tz=timezone.utc)
         timestamp = now.strftime("%Y%m%d_%H%M%S")
-        run_dir = self.config.output_dir / challenge_dir.name / timestamp
+        run_dir = self.config.output_dir / challenge_dir.name
+        if self.run_label:
+            run_dir = run_dir / self.run_label
+        run_dir = run_dir / timestamp
         run_dir.mkdir(parents=True, exist_ok=True)
 
         system_prompt = self._load_system_prompt()
-        context_files = collect_context(
-            challenge_dir=challenge_dir,
-            globs=self.config.context_globs,
-            max_files=self.config.max_context_files,
-            max_total_bytes=self.config.max_context_bytes,
-        )
-        context_text = render_context(context_files)
+        context_text = self._context_text(challenge_dir)
+        # Let local backends load the model while the first prompt is assembled. The size
+        # budget covers later iterations too (three feedback blocks plus the previous spec).
+        self.llm_client.warm_up(len(system_prompt) + len(context_text) + 40000)
+        seed_specs, seed_sources = self._seed_specs(challenge_dir)
+        self._notify("challenge_start", challenge_dir, max_iterations=self.max_iterations)
 
         feedback_history: list[str] = []
         previous_spec = ""
         final_status = "max-iterations"
         iteration_results: list[IterationResult] = []
+        seen_specs: dict[tuple[str, str, str, str], int] = {}
+        convergence = self.config.convergence
+        tracker = ProgressTracker(convergence.patience, convergence.cycle_window) if convergence.enabled else None
+        temperature: float | None = None
+        escalations = 0
+        progress_events: list[dict[str, Any]] = []
 
         for idx in range(1, self.max_iterations + 1):
             iter_dir = run_dir / f"iter_{idx:02d}"
             iter_dir.mkdir(parents=True, exist_ok=True)
 
-            workspace_dir = iter_dir / "workspace"
-            shutil.copytree(challenge_dir, workspace_dir)
-
-            # Remove stale Certora artifacts copied from source challenge folders.
-            stale_internal = workspace_dir / ".certora_internal"
-            if stale_internal.exists():
-                shutil.rmtree(stale_internal, ignore_errors=True)
-            for stale_report in workspace_dir.glob("emv-*"):
-                if stale_report.is_dir():
-                    shutil.rmtree(stale_report, ignore_errors=True)
-
-            user_prompt = self._build_user_prompt(
-                challenge_dir=challenge_dir,
-                context_text=context_text,
-                feedback_history=feedback_history,
-                previous_spec=previous_spec,
-                iteration=idx,
-            )
-
-            _write_json(
-                iter_dir / "prompt.json",
-                {
-                    "system_prompt": system_prompt,
-                    "user_prompt": user_prompt,
-                },
-            )
-
             try:
-                llm_response = self.llm_client.complete_json(system_prompt=system_prompt, user_prompt=user_prompt)
-            except LLMError as exc:
-                final_status = "llm-error"
-                _write_text(iter_dir / "llm_error.txt", str(exc))
-                break
-
-            _write_text(iter_dir / "llm_raw.txt", llm_response.raw_text)
-            _write_json(iter_dir / "llm_parsed.json", llm_response.payload)
-
-            spec_text = str(llm_response.payload.get("spec", "")).strip()
-            if not spec_text:
-                spec_text = "invariant fallback_noop() true;\n"
-
-            spec_rel = str(llm_response.payload.get("spec_path", self.config.certora.spec_path))
-            command = self.config.certora.command_template.format(spec_path=spec_rel)
-
-            spec_path = workspace_dir / spec_rel
-            spec_path.parent.mkdir(parents=True, exist_ok=True)
-            _write_text(spec_path, spec_text)
-
-            certora_result = run_certora(
-                command=command,
-                cwd=workspace_dir,
-                timeout_sec=self.config.certora.timeout_sec,
-                success_markers=self.config.certora.success_markers,
-                failure_markers=self.config.certora.failure_markers,
-                dry_run=self.dry_run,
-            )
+                user_prompt = self._build_user_prompt(
+                    challenge_dir=challenge_dir,
+                    context_text=context_text,
+                    feedback_history=feedback_history,
+                    previous_spec=previous_spec,
+                    iteration=idx,
+                    seed_specs=seed_specs,
+                )
 
-            _write_text(
-                iter_dir / "certora.log",
-                "--- STDOUT ---\n"
-                f"{certora_result.stdout}\n\n"
-                "--- STDERR ---\n"
-                f"{certora_result.stderr}\n",
-            )
-            _write_json(
-                iter_dir / "iteration_summary.json",
-                {
-                    "index": idx,
-                    "spec_path": spec_rel,
-                    "command": command,
-                    "certora_status": certora_result.status,
-                    "certora_exit_code": certora_result.exit_code,
-                    "certora_reason": certora_result.reason,
-                    "elapsed_sec": certora_result.elapsed_sec,
-                },
-            )
+                _write_json(
+                    iter_dir / "prompt.json",
+                    {
+                        "system_prompt": system_prompt,
+                        "user_prompt": user_prompt,
+                    },
+                )
+
+                llm_kwargs: dict[str, Any] = {}
+                if temperature is not None:
+                    llm_kwargs["temperature"] = temperature
+                self._notify("phase", challenge_dir, phase="llm", iteration=idx)
+                llm_started = time.monotonic()
+                try:
+                    llm_response, reasks = self._request_spec(system_prompt, user_prompt, iter_dir, llm_kwargs)
+                except LLMParseError as exc:
+                    # No usable spec: skip the prover and tell the model what went wrong.
+                    _write_text(iter_dir / "llm_error.txt", str(exc))
+                    iteration = IterationResult(
+                        index=idx,
+                        spec_path="",
+                        command="",
+                        certora_status="llm-parse-error",
+                        certora_exit_code=-1,
+                        certora_reason=str(exc),
+                        elapsed_sec=0.0,
+                        prover_skipped=True,
+                        llm_sec=round(time.monotonic() - llm_started, 3),
+                    )
+                    _write_json(iter_dir / "iteration_summary.json", iteration.__dict__)
+                    iteration_results.append(iteration)
+                    self._notify("iteration", challenge_dir, result=iteration.__dict__)
+                    feedback_history.append(
+                        f"INVALID RESPONSE: {exc}. Return one complete JSON object with the required keys."
+                    )
+                    observation = observe_parse_error(idx, str(exc))
+                    action = self._progress_action(tracker, observation, escalations, progress_events)
+                    if action == "stop":
+                        final_status = "stagnated"
+                        break
+                    if action == "escalate":
+                        escalations += 1
+                        temperature = convergence.escalate_temperature
+                        feedback_history = []
+                        previous_spec = ""
+                    continue
+                except LLMError as exc:
+                    self._notify("llm_error", challenge_dir, llm_sec=time.monotonic() - llm_started)
+                    final_status = "llm-error"
+                    _write_text(iter_dir / "llm_error.txt", str(exc))
+                    break
+
+                llm_sec = time.monotonic() - llm_started
+                _write_json(iter_dir / "llm_parsed.json", llm_response.payload)
+
+                spec_text = str(llm_response.payload["spec"]).strip()
+                spec_rel = str(llm_response.payload.get("spec_path") or self.config.certora.spec_path)
+                command = self.config.certora.command_template.format(spec_path=spec_rel)
+
+                spec_hash = spec_fingerprint(spec_text)
+                cache_key = (str(challenge_dir.resolve()), spec_rel, command, spec_hash)
+                repeat_of = seen_specs.get(cache_key)
+                with self._spec_lock(cache_key):
+                    cached_result = None if self.dry_run else self.spec_results.get(cache_key)
+                    solc_stats = {"hits": 0, "misses": 0}
+
+                    if cached_result is not None:
+                        certora_result = cached_result
+                        _write_text(iter_dir / "spec.cvl", spec_text)
+                    else:
+                        workspace_dir = self._prepare_workspace(challenge_dir, iter_dir)
+                        spec_path = workspace_dir / spec_rel
+                        spec_path.parent.mkdir(parents=True, exist_ok=True)
+                        _write_text(spec_path, spec_text)
+
+                        certora_env = None
+                        solc_stats_file = iter_dir / "solc_cache.jsonl"
+                        if self.compile_cache is not None and not self.dry_run:
+                            certora_env = self.compile_cache.prepare(workspace_dir, stats_file=solc_stats_file)
+
+                        self._notify("phase", challenge_dir, phase="prover-wait", iteration=idx)
+                        with self._prover_slot():
+                            self._notify("phase", challenge_dir, phase="prover", iteration=idx)
+                            certora_result = run_certora(
+                                command=command,
+                                cwd=workspace_dir,
+                                timeout_sec=self.config.certora.timeout_sec,
+                                success_markers=self.config.certora.success_markers,
+                                failure_markers=self.config.certora.failure_markers,
+                                dry_run=self.dry_run,
+                                env=certora_env,
+                                pool=self.prover_pool,
+                            )
+                        solc_stats = read_stats(solc_stats_file)
+                        # Timeouts depend on machine load, so they are always retried.
+                        if certora_result.status in {"success", "failure"}:
+                            self.spec_results[cache_key] = certora_result
+
+                if repeat_of is None:
+                    seen_specs[cache_key] = idx
+
+                _write_text(
+                    iter_dir / "certora.log",
+                    "--- STDOUT ---\n"
+                    f"{certora_result.stdout}\n\n"
+                    "--- STDERR ---\n"
+                    f"{certora_result.stderr}\n",
+                )
 
-            iteration_results.append(
-                IterationResult(
+                iteration = IterationResult(
                     index=idx,
                     spec_path=spec_rel,
                     command=command,
                     certora_status=certora_result.status,
                     certora_exit_code=certora_result.exit_code,
                     certora_reason=certora_result.reason,
-                    elapsed_sec=certora_result.elapsed_sec,
+                    elapsed_sec=0.0 if cached_result is not None else certora_result.elapsed_sec,
+                    compile_cache_hits=solc_stats["hits"],
+                    compile_cache_misses=solc_stats["misses"],
+                    spec_hash=spec_hash,
+                    repeat_of=repeat_of,
+                    prover_skipped=cached_result is not None,
+                    llm_repairs=llm_response.repairs,
+                    llm_reasks=reasks,
+                    llm_sec=round(llm_sec, 3),
+                    prompt_tokens=llm_response.usage.get("prompt_tokens", 0),
+                    completion_tokens=llm_response.usage.get("completion_tokens", 0),
+                    llm_warnings=llm_response.warnings,
                 )
-            )
-
-            if self.dry_run:
-                final_status = "dry-run"
-                break
-
-            if certora_result.status == "success":
-                final_status = "success"
-                break
-
-            feedback = summarize_feedback(certora_result)
-            feedback_history.append(feedback)
-            previous_spec = spec_text
+                _write_json(iter_dir / "iteration_summary.json", iteration.__dict__)
+                iteration_results.append(iteration)
+                self._notify("iteration", challenge_dir, result=iteration.__dict__)
+
+                if self.dry_run:
+                    final_status = "dry-run"
+                    break
+
+                if certora_result.status == "success":
+                    final_status = "success"
+                    break
+
+                feedback = summarize_feedback(certora_result)
+                if repeat_of is not None and cached_result is not None:
+                    feedback = (
+                        f"REPEATED SPEC: this spec is semantically identical to iteration {repeat_of} "
+                        "(only whitespace, comments or declaration order changed). The prover was not "
+                        "re-run and returned the same result below. Make a substantive change.\n"
+                        f"{feedback}"
+                    )
+                elif repeat_of is not None:
+                    feedback = (
+                        f"REPEATED SPEC: this spec repeats iteration {repeat_of}; it was re-run because the "
+                        "last attempt timed out. Simplify it or make a substantive change.\n"
+                        f"{feedback}"
+                    )
+                feedback_history.append(feedback)
+                previous_spec = spec_text
+
+                observation = observe_result(idx, spec_hash, certora_result)
+                action = self._progress_action(tracker, observation, escalations, progress_events)
+                if action == "stop":
+                    final_status = "stagnated"
+                    break
+                if action == "escalate":
+                    # Restart from a clean prompt at a higher temperature so the model stops
+                    # anchoring on the spec and feedback it keeps circling around.
+                    escalations += 1
+                    temperature = convergence.escalate_temperature
+                    feedback_history = []
+                    previous_spec = ""
+            finally:
+                if self.artifact_store is not None:
+                    archive_iteration(
+                        self.artifact_store,
+                        iter_dir,
+                        keep_workspace=self.config.artifacts.keep_workspace,
+                    )
 
         summary = {
             "challenge": str(challenge_dir),
             "run_dir": str(run_dir),
             "status": final_status,
             "iterations": [item.__dict__ for item in iteration_results],
+            "seed_specs": seed_sources,
+            "progress_events": progress_events,
             "timestamp_utc": now.isoformat(),
         }
         _write_json(run_dir / "summary.json", summary)
+        self._notify("challenge_end", challenge_dir, status=final_status)
         return summary
 
 
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any
+
+try:
+    import zstandard
+except ImportError:  # optional dependency, gzip is used instead
+    zstandard = None
+
+
+MANIFEST_NAME = "manifest.json"
+ARCHIVED_FILES = ("prompt.json", "llm_raw.txt", "certora.log")
+
+_SUFFIXES = {"zstd": ".zst", "gzip": ".gz", "none": ""}
+
+# Files above this size are split with content-defined chunking so that the large
+# context block repeated in every prompt.json is stored once.
+_CHUNK_THRESHOLD = 64 * 1024
+_CHUNK_MIN = 4 * 1024
+_CHUNK_MAX = 256 * 1024
+_CHUNK_MASK = (1 << 14) - 1
+_GEAR = [
+    int.from_bytes(hashlib.sha256(bytes([value])).digest()[:4], "little") for value in range(256)
+]
+
+
+class ArtifactError(RuntimeError):
+    pass
+
+
+def _resolve_codec(compression: str) -> str:
+    codec = compression.strip().lower()
+    if codec == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    if codec not in _SUFFIXES:
+        raise ArtifactError(f"Unsupported artifact compression: {compression}")
+    if codec == "zstd" and zstandard is None:
+        raise ArtifactError("compression=zstd requires the 'zstandard' package")
+    return codec
+
+
+def _chunk(data: bytes) -> list[bytes]:
+    if len(data) <= _CHUNK_THRESHOLD:
+        return [data]
+
+    chunks: list[bytes] = []
+    start = 0
+    rolling = 0
+    gear = _GEAR
+    for pos, byte in enumerate(data):
+        rolling = ((rolling << 1) + gear[byte]) & 0xFFFFFFFF
+        size = pos + 1 - start
+        if size < _CHUNK_MIN:
+            continue
+        if (rolling & _CHUNK_MASK) == 0 or size >= _CHUNK_MAX:
+            chunks.append(data[start : pos + 1])
+            start = pos + 1
+            rolling = 0
+    if start < len(data):
+        chunks.append(data[start:])
+    return chunks
+
+
+class ArtifactStore:
+    def __init__(self, root: Path, compression: str = "auto"):
+        self.root = root
+        self.codec = _resolve_codec(compression)
+        self.blob_dir = root / "blobs"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self._known: set[str] = set()
+
+    def _blob_path(self, digest: str, codec: str) -> Path:
+        return self.blob_dir / digest[:2] / f"{digest}{_SUFFIXES[codec]}"
+
+    def _find_blob(self, digest: str) -> tuple[Path, str] | None:
+        for codec in _SUFFIXES:
+            candidate = self._blob_path(digest, codec)
+            if candidate.exists():
+                return candidate, codec
+        return None
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=10).compress(data)
+        if self.codec == "gzip":
+            return gzip.compress(data, compresslevel=6, mtime=0)
+        return data
+
+    def put(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self._known or self._find_blob(digest) is not None:
+            self._known.add(digest)
+            return digest
+
+        target = self._blob_path(digest, self.codec)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=str(target.parent), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(self._compress(data))
+            os.replace(tmp_name, target)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self._known.add(digest)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        found = self._find_blob(digest)
+        if found is None:
+            raise ArtifactError(f"Missing blob {digest} in {self.blob_dir}")
+        path, codec = found
+        raw = path.read_bytes()
+        if codec == "zstd":
+            if zstandard is None:
+                raise ArtifactError(f"Blob {digest} is zstd-compressed but 'zstandard' is not installed")
+            return zstandard.ZstdDecompressor().decompress(raw)
+        if codec == "gzip":
+            return gzip.decompress(raw)
+        return raw
+
+    def put_file(self, path: Path, chunked: bool = True) -> dict[str, Any]:
+        data = path.read_bytes()
+        return {
+            "size": len(data),
+            "mode": path.stat().st_mode & 0o777,
+            "chunks": [self.put(chunk) for chunk in (_chunk(data) if chunked else [data])],
+        }
+
+    def read_entry(self, entry: dict[str, Any]) -> bytes:
+        return b"".join(self.get(digest) for digest in entry["chunks"])
+
+    def ingest_tree(self, directory: Path) -> dict[str, dict[str, Any]]:
+        entries: dict[str, dict[str, Any]] = {}
+        for path in sorted(directory.rglob("*")):
+            if path.is_file() and not path.is_symlink():
+                # Workspace files are mostly unchanged copies of the challenge, which a
+                # whole-file hash already dedups; chunking them only burns CPU.
+                entries[path.relative_to(directory).as_posix()] = self.put_file(path, chunked=False)
+        return entries
+
+    def materialize_tree(self, entries: dict[str, dict[str, Any]], dest: Path) -> None:
+        for rel, entry in entries.items():
+            target = dest / rel
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(self.read_entry(entry))
+            os.chmod(target, entry.get("mode", 0o644))
+
+
+def archive_iteration(store: ArtifactStore, iter_dir: Path, keep_workspace: bool = False) -> dict[str, Any]:
+    workspace_dir = iter_dir / "workspace"
+    workspace = store.ingest_tree(workspace_dir) if workspace_dir.is_dir() else {}
+    files = {
+        name: store.put_file(iter_dir / name) for name in ARCHIVED_FILES if (iter_dir / name).is_file()
+    }
+    manifest = {
+        "store": str(store.root),
+        "codec": store.codec,
+        "files": files,
+        "workspace": workspace,
+        "stored_bytes": sum(entry["size"] for entry in [*files.values(), *workspace.values()]),
+    }
+    with (iter_dir / MANIFEST_NAME).open("w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2)
+        handle.write("\n")
+
+    for name in files:
+        (iter_dir / name).unlink()
+    if not keep_workspace and workspace_dir.is_dir():
+        shutil.rmtree(workspace_dir, ignore_errors=True)
+    return manifest
+
+
+def load_manifest(iter_dir: Path) -> dict[str, Any] | None:
+    manifest_path = iter_dir / MANIFEST_NAME
+    if not manifest_path.is_file():
+        return None
+    with manifest_path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def materialize_iteration(store: ArtifactStore, iter_dir: Path, dest: Path | None = None) -> Path:
+    manifest = load_manifest(iter_dir)
+    if manifest is None:
+        raise ArtifactError(f"No {MANIFEST_NAME} in {iter_dir}")
+    dest = dest or iter_dir
+    store.materialize_tree(manifest["files"], dest)
+    store.materialize_tree(manifest["workspace"], dest / "workspace")
+    return dest
+
+
+def read_iteration_file(iter_dir: Path, name: str, store: ArtifactStore | None = None) -> str | None:
+    direct = iter_dir / name
+    if direct.is_file():
+        return direct.read_text(encoding="utf-8", errors="ignore")
+
+    manifest = load_manifest(iter_dir)
+    if manifest is None:
+        return None
+    entry = manifest["files"].get(name)
+    if entry is None and name.startswith("workspace/"):
+        entry = manifest["workspace"].get(name[len("workspace/") :])
+    if entry is None:
+        return None
+    store = store or ArtifactStore(Path(manifest["store"]))
+    return store.read_entry(entry).decode("utf-8", errors="ignore")
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import re
 import subprocess
 import time
 from dataclasses import dataclass
 from pathlib import Path
 
+from .prover_pool import ProverPool
+
 
 @dataclass
 class CertoraResult:
@@ -21,6 +24,14 @@ class CertoraTimeoutError(RuntimeError):
     pass
 
 
+# Prover output that means the spec itself did not compile or type-check.
+_BROKEN_SPEC_RE = re.compile(r"syntax error|type error|parse error|compilation failed|CVL.*error", re.IGNORECASE)
+
+
+def is_broken_spec_output(text: str) -> bool:
+    return bool(_BROKEN_SPEC_RE.search(text))
+
+
 def _contains_any(haystack: str, needles: list[str]) -> bool:
     lowered = haystack.lower()
     return any(marker.lower() in lowered for marker in needles)
@@ -33,6 +44,8 @@ def run_certora(
     success_markers: list[str],
     failure_markers: list[str],
     dry_run: bool = False,
+    env: dict[str, str] | None = None,
+    pool: ProverPool | None = None,
 ) -> CertoraResult:
     start = time.time()
 
@@ -48,37 +61,40 @@ def run_certora(
             reason="Execution skipped by --dry-run",
         )
 
-    try:
-        proc = subprocess.run(
-            command,
-            cwd=str(cwd),
-            shell=True,
-            check=False,
-            capture_output=True,
-            text=True,
-            timeout=timeout_sec,
-        )
-    except subprocess.TimeoutExpired as exc:
-        elapsed = time.time() - start
-        stdout = exc.stdout or ""
-        stderr = exc.stderr or ""
-        return CertoraResult(
-            command=command,
-            exit_code=124,
-            elapsed_sec=elapsed,
-            stdout=stdout,
-            stderr=stderr,
-            status="timeout",
-            reason=f"Timeout after {timeout_sec}s",
-        )
+    outcome = None
+    if pool is not None:
+        # None means the pool could not serve the job; fall back to a one-shot subprocess.
+        outcome = pool.run(command=command, cwd=cwd, timeout_sec=timeout_sec, env=env)
+        if outcome is None:
+            env = pool.fallback_env(env)
+
+    if outcome is None:
+        try:
+            proc = subprocess.run(
+                command,
+                cwd=str(cwd),
+                shell=True,
+                check=False,
+                capture_output=True,
+                text=True,
+                timeout=timeout_sec,
+                env=env,
+            )
+        except subprocess.TimeoutExpired as exc:
+            return _timeout_result(command, start, timeout_sec, exc.stdout or "", exc.stderr or "")
+        exit_code, stdout, stderr = proc.returncode, proc.stdout, proc.stderr
+    else:
+        if outcome.timed_out:
+            return _timeout_result(command, start, timeout_sec, outcome.stdout, outcome.stderr)
+        exit_code, stdout, stderr = outcome.exit_code, outcome.stdout, outcome.stderr
 
     elapsed = time.time() - start
-    combined = f"{proc.stdout}\n{proc.stderr}"
+    combined = f"{stdout}\n{stderr}"
 
-    if proc.returncode == 0 and _contains_any(combined, success_markers):
+    if exit_code == 0 and _contains_any(combined, success_markers):
         status = "success"
         reason = "Found success marker"
-    elif proc.returncode == 0 and not _contains_any(combined, failure_markers):
+    elif exit_code == 0 and not _contains_any(combined, failure_markers):
         status = "success"
         reason = "Zero exit code and no failure marker"
     else:
@@ -87,15 +103,27 @@ def run_certora(
 
     return CertoraResult(
         command=command,
-        exit_code=proc.returncode,
+        exit_code=exit_code,
         elapsed_sec=elapsed,
-        stdout=proc.stdout,
-        stderr=proc.stderr,
+        stdout=stdout,
+        stderr=stderr,
         status=status,
         reason=reason,
     )
 
 
+def _timeout_result(command: str, start: float, timeout_sec: int, stdout: str, stderr: str) -> CertoraResult:
+    return CertoraResult(
+        command=command,
+        exit_code=124,
+        elapsed_sec=time.time() - start,
+        stdout=stdout,
+        stderr=stderr,
+        status="timeout",
+        reason=f"Timeout after {timeout_sec}s",
+    )
+
+
 def summarize_feedback(result: CertoraResult, max_chars: int = 10000) -> str:
     combined = (
         f"status={result.status}; reason={result.reason}; exit_code={result.exit_code}; "
@@ -3,11 +3,44 @@ from __future__ import annotations
 import argparse
 import json
 import sys
+from contextlib import nullcontext
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any
 
 from .agent import HarnessRunner
+from .artifacts import ArtifactError, ArtifactStore, materialize_iteration
 from .config import load_config
+from .corpus import SORT_KEYS
 from .llm import LLMError, create_llm_client
+from .matrix import build_llm_configs, parse_llm_override, render_table, run_matrix
+from .metrics import ProgressReporter, RunMetrics
+from .retrieval import SpecIndex
+from .work_queue import Job, WorkQueue, run_worker, wait_for_jobs
+
+
+def _add_corpus_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--sort", choices=SORT_KEYS, help="Order challenges via the corpus manifest")
+    parser.add_argument("--min-bytes", type=int, help="Skip challenges smaller than this many bytes")
+    parser.add_argument("--refresh", action="store_true", help="Rescan every challenge into the manifest")
+
+
+def _add_progress_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--progress", action="store_true", help="Show a live status block on stderr")
+    parser.add_argument(
+        "--metrics-file",
+        help="Periodically write metrics here (Prometheus textfile format, or JSON for *.json)",
+    )
+    parser.add_argument("--metrics-interval", type=float, default=5.0, help="Seconds between metric updates")
+
+
+def _reporter(metrics: RunMetrics, progress: bool, metrics_file: str | None, interval: float) -> ProgressReporter:
+    return ProgressReporter(
+        metrics,
+        metrics_file=Path(metrics_file) if metrics_file else None,
+        progress=progress,
+        interval_sec=interval,
+    )
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -17,6 +50,8 @@ def build_parser() -> argparse.ArgumentParser:
     list_parser = subparsers.add_parser("list", help="List challenges from config")
     list_parser.add_argument("--config", required=True, help="Path to harness YAML config")
     list_parser.add_argument("--limit", type=int, default=20, help="Max number of challenges")
+    list_parser.add_argument("--details", action="store_true", help="Show file counts, sizes and hashes")
+    _add_corpus_args(list_parser)
 
     run_parser = subparsers.add_parser("run", help="Run harness against one or more challenges")
     run_parser.add_argument("--config", required=True, help="Path to harness YAML config")
@@ -30,23 +65,109 @@ def build_parser() -> argparse.ArgumentParser:
     run_parser.add_argument("--limit", type=int, default=1, help="Number of challenges when auto-discovering")
     run_parser.add_argument("--max-iterations", type=int, help="Override iteration budget")
     run_parser.add_argument("--dry-run", action="store_true", help="Skip Certora execution")
+    _add_corpus_args(run_parser)
+    _add_progress_args(run_parser)
+
+    matrix_parser = subparsers.add_parser(
+        "matrix", help="Run every (challenge, model) pair in one process and compare models"
+    )
+    matrix_parser.add_argument("--config", required=True, help="Path to base harness YAML config")
+    matrix_parser.add_argument(
+        "--llm",
+        action="append",
+        default=[],
+        help=(
+            "LLM override as PROVIDER:MODEL or key=value,... (repeatable; adds to config 'matrix'); "
+            "list values such as endpoints are separated by ';'"
+        ),
+    )
+    matrix_parser.add_argument("--challenge", help="Optional single challenge path (same rules as run)")
+    matrix_parser.add_argument("--limit", type=int, default=1, help="Number of challenges when auto-discovering")
+    matrix_parser.add_argument("--max-iterations", type=int, help="Override iteration budget")
+    matrix_parser.add_argument("--dry-run", action="store_true", help="Skip Certora execution")
+    matrix_parser.add_argument("--parallel", type=int, help="Concurrent cells (default: number of models)")
+    matrix_parser.add_argument("--prover-slots", type=int, default=1, help="Concurrent prover runs")
+    _add_corpus_args(matrix_parser)
+    _add_progress_args(matrix_parser)
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="Enqueue challenges into a shared work queue and collect worker results"
+    )
+    serve_parser.add_argument("--config", required=True, help="Path to harness YAML config")
+    serve_parser.add_argument("--queue", required=True, help="Path to the SQLite queue on shared storage")
+    serve_parser.add_argument("--challenge", help="Optional single challenge path (same rules as run)")
+    serve_parser.add_argument("--limit", type=int, help="Number of challenges when auto-discovering")
+    serve_parser.add_argument("--max-iterations", type=int, help="Override iteration budget")
+    serve_parser.add_argument("--dry-run", action="store_true", help="Skip Certora execution")
+    serve_parser.add_argument("--lease-sec", type=int, default=1800, help="Worker lease duration")
+    serve_parser.add_argument("--poll-interval", type=float, default=10.0, help="Seconds between queue polls")
+    serve_parser.add_argument("--no-wait", action="store_true", help="Enqueue and exit without waiting")
+    _add_corpus_args(serve_parser)
+
+    worker_parser = subparsers.add_parser("worker", help="Lease and run jobs from a shared work queue")
+    worker_parser.add_argument("--queue", required=True, help="Path to the SQLite queue on shared storage")
+    worker_parser.add_argument("--worker-id", help="Worker identity (default: hostname:pid)")
+    worker_parser.add_argument("--lease-sec", type=int, default=1800, help="Worker lease duration")
+    worker_parser.add_argument("--poll-interval", type=float, default=10.0, help="Seconds between queue polls")
+    worker_parser.add_argument("--max-jobs", type=int, help="Exit after this many jobs")
+    worker_parser.add_argument("--exit-when-idle", action="store_true", help="Exit once the queue is empty")
+
+    index_parser = subparsers.add_parser(
+        "index", help="Build the retrieval index of past verified/violating specs"
+    )
+    index_parser.add_argument("--config", required=True, help="Path to harness YAML config")
+    index_parser.add_argument("--rebuild", action="store_true", help="Drop the index and rescan output_dir")
+    index_parser.add_argument("--query", help="Show the top matches for this challenge path")
+
+    materialize_parser = subparsers.add_parser(
+        "materialize", help="Rebuild an archived iteration's workspace and logs from the artifact store"
+    )
+    materialize_parser.add_argument("--config", required=True, help="Path to harness YAML config")
+    materialize_parser.add_argument("--iteration-dir", required=True, help="Path to runs/<challenge>/<ts>/iter_NN")
+    materialize_parser.add_argument("--dest", help="Output directory (default: the iteration directory)")
 
     return parser
 
 
-def _cmd_list(config_path: Path, limit: int) -> int:
+def _cmd_list(
+    config_path: Path,
+    limit: int,
+    details: bool,
+    sort: str | None,
+    min_bytes: int | None,
+    refresh: bool,
+) -> int:
     config = load_config(config_path)
 
     # List mode does not require LLM initialization.
     runner = HarnessRunner(config=config, llm_client=_NoopLLMClient(), dry_run=True)
-    challenges = runner.discover_challenges(limit=limit)
+    try:
+        challenges = runner.discover_challenges(
+            limit=limit,
+            sort=sort or (config.corpus.sort if details else None),
+            min_bytes=min_bytes,
+            refresh=refresh,
+        )
+    except ValueError as exc:
+        print(f"Invalid corpus options: {exc}", file=sys.stderr)
+        return 2
 
     if not challenges:
         print("No challenges found.")
         return 1
 
+    if not details:
+        for challenge in challenges:
+            print(challenge)
+        return 0
+
+    records = {record.path: record for record in runner.corpus_manifest().records.values()}
     for challenge in challenges:
-        print(challenge)
+        record = records[str(challenge)]
+        print(
+            f"{record.id}\t{record.file_count} files\t{record.sol_file_count} sol\t"
+            f"{record.total_bytes} bytes\t{record.content_hash[:12]}\t{record.path}"
+        )
     return 0
 
 
@@ -56,6 +177,12 @@ def _cmd_run(
     limit: int,
     dry_run: bool,
     max_iterations: int | None,
+    sort: str | None = None,
+    min_bytes: int | None = None,
+    refresh: bool = False,
+    progress: bool = False,
+    metrics_file: str | None = None,
+    metrics_interval: float = 5.0,
 ) -> int:
     config = load_config(config_path)
 
@@ -65,15 +192,25 @@ def _cmd_run(
         print(f"Failed to initialize LLM client: {exc}", file=sys.stderr)
         return 2
 
+    metrics = RunMetrics()
     runner = HarnessRunner(
         config=config,
         llm_client=llm_client,
         dry_run=dry_run,
         max_iterations_override=max_iterations,
+        observer=metrics,
     )
 
     specific = Path(challenge) if challenge else None
-    results = runner.run(specific_challenge=specific, limit=limit)
+    reporter = _reporter(metrics, progress, metrics_file, metrics_interval) if progress or metrics_file else None
+    with reporter or nullcontext():
+        results = runner.run(
+            specific_challenge=specific,
+            limit=limit,
+            sort=sort,
+            min_bytes=min_bytes,
+            refresh=refresh,
+        )
 
     if not results:
         print("No matching challenges found.")
@@ -88,14 +225,236 @@ def _cmd_run(
     return 0 if any_success else 3
 
 
+def _cmd_matrix(
+    config_path: Path,
+    llm_overrides: list[str],
+    challenge: str | None,
+    limit: int,
+    dry_run: bool,
+    max_iterations: int | None,
+    parallel: int | None,
+    prover_slots: int,
+    sort: str | None = None,
+    min_bytes: int | None = None,
+    refresh: bool = False,
+    progress: bool = False,
+    metrics_file: str | None = None,
+    metrics_interval: float = 5.0,
+) -> int:
+    config = load_config(config_path)
+
+    try:
+        overrides = [*config.matrix, *(parse_llm_override(item) for item in llm_overrides)]
+        llm_configs = build_llm_configs(config.llm, overrides)
+    except ValueError as exc:
+        print(f"Invalid matrix: {exc}", file=sys.stderr)
+        return 2
+    if not llm_configs:
+        print("No models to compare. Add --llm PROVIDER:MODEL or a 'matrix' list to the config.", file=sys.stderr)
+        return 2
+
+    runner = HarnessRunner(config=config, llm_client=_NoopLLMClient(), dry_run=True)
+    specific = Path(challenge) if challenge else None
+    challenges = runner.discover_challenges(
+        specific_challenge=specific,
+        limit=limit,
+        sort=sort,
+        min_bytes=min_bytes,
+        refresh=refresh,
+    )
+    if not challenges:
+        print("No matching challenges found.")
+        return 1
+
+    metrics = RunMetrics()
+    reporter = _reporter(metrics, progress, metrics_file, metrics_interval) if progress or metrics_file else None
+    with reporter or nullcontext():
+        rows = run_matrix(
+            config=config,
+            llm_configs=llm_configs,
+            challenges=challenges,
+            dry_run=dry_run,
+            max_iterations=max_iterations,
+            parallel=parallel,
+            prover_slots=prover_slots,
+            observer=metrics,
+        )
+
+    timestamp = datetime.now(tz=timezone.utc).strftime("%Y%m%d_%H%M%S")
+    report_path = config.output_dir / "matrix" / f"{timestamp}.json"
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(rows, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    print(render_table(rows))
+    print(f"\nFull results: {report_path}")
+
+    any_success = any(row["summary"].get("status") == "success" for row in rows)
+    if dry_run:
+        return 0
+    return 0 if any_success else 3
+
+
+def _cmd_serve(
+    config_path: Path,
+    queue_path: Path,
+    challenge: str | None,
+    limit: int | None,
+    dry_run: bool,
+    max_iterations: int | None,
+    lease_sec: int,
+    poll_interval: float,
+    wait: bool,
+    sort: str | None = None,
+    min_bytes: int | None = None,
+    refresh: bool = False,
+) -> int:
+    config = load_config(config_path)
+
+    # Enumerating challenges does not require LLM initialization.
+    runner = HarnessRunner(config=config, llm_client=_NoopLLMClient(), dry_run=True)
+    specific = Path(challenge) if challenge else None
+    challenges = runner.discover_challenges(
+        specific_challenge=specific,
+        limit=limit,
+        sort=sort,
+        min_bytes=min_bytes,
+        refresh=refresh,
+    )
+    if not challenges:
+        print("No matching challenges found.")
+        return 1
+
+    queue = WorkQueue(queue_path, lease_sec=lease_sec)
+    options = {"dry_run": dry_run, "max_iterations": max_iterations}
+    job_ids = [
+        queue.enqueue(str(challenge_dir), str(config_path.resolve()), options)
+        for challenge_dir in challenges
+    ]
+    print(f"Enqueued {len(job_ids)} job(s) into {queue.path}", file=sys.stderr)
+    if not wait:
+        return 0
+
+    def _report(row: dict[str, Any]) -> None:
+        counts = queue.counts()
+        print(
+            f"[serve] job {row['job_id']} {row['job_status']} ({row['challenge']}); "
+            f"queued={counts['queued']} leased={counts['leased']}",
+            file=sys.stderr,
+        )
+
+    rows = wait_for_jobs(queue, job_ids, poll_interval=poll_interval, on_finished=_report)
+    results = [row["result"] for row in rows if row["result"] is not None]
+    for row in rows:
+        if row["result"] is None:
+            print(f"Job {row['job_id']} failed: {row['error']}", file=sys.stderr)
+    for item in results:
+        print(json.dumps(item, indent=2))
+
+    any_success = any(item.get("status") == "success" for item in results)
+    if dry_run:
+        return 0
+    return 0 if any_success else 3
+
+
+def _cmd_index(config_path: Path, rebuild: bool, query: str | None) -> int:
+    config = load_config(config_path)
+    index_path = config.retrieval.index_path or config.output_dir / ".spec_index.json"
+    index = SpecIndex(index_path, config.output_dir)
+    added = index.refresh(rebuild=rebuild)
+    print(f"Indexed {len(index.entries)} spec(s) ({added} new) in {index_path}")
+
+    if query:
+        runner = HarnessRunner(config=config, llm_client=_NoopLLMClient(), dry_run=True)
+        challenges = runner.discover_challenges(specific_challenge=Path(query))
+        if not challenges:
+            print(f"Challenge not found: {query}", file=sys.stderr)
+            return 1
+        matches = index.query(
+            challenges[0],
+            top_k=config.retrieval.top_k,
+            min_score=config.retrieval.min_score,
+            exclude_same_challenge=config.retrieval.exclude_same_challenge,
+        )
+        for match in matches:
+            print(f"{match.score:.3f} {match.entry.outcome:<9} {match.entry.run_dir} iter {match.entry.iteration}")
+    return 0
+
+
+def _cmd_materialize(config_path: Path, iteration_dir: Path, dest: Path | None) -> int:
+    config = load_config(config_path)
+    store_dir = config.artifacts.store_dir
+    if store_dir is None or not store_dir.exists():
+        print(f"Artifact store not found: {store_dir}", file=sys.stderr)
+        return 1
+
+    try:
+        out_dir = materialize_iteration(ArtifactStore(store_dir), iteration_dir, dest)
+    except ArtifactError as exc:
+        print(f"Failed to materialize {iteration_dir}: {exc}", file=sys.stderr)
+        return 1
+
+    print(out_dir)
+    return 0
+
+
+def _execute_job(job: Job) -> dict[str, Any]:
+    config = load_config(job.config_path)
+    llm_client = create_llm_client(config.llm)
+    runner = HarnessRunner(
+        config=config,
+        llm_client=llm_client,
+        dry_run=bool(job.options.get("dry_run", False)),
+        max_iterations_override=job.options.get("max_iterations"),
+    )
+    return runner._run_single(Path(job.challenge))
+
+
+def _cmd_worker(
+    queue_path: Path,
+    worker_id: str | None,
+    lease_sec: int,
+    poll_interval: float,
+    max_jobs: int | None,
+    exit_when_idle: bool,
+) -> int:
+    queue = WorkQueue(queue_path, lease_sec=lease_sec)
+    processed = run_worker(
+        queue,
+        execute=_execute_job,
+        worker_id=worker_id,
+        poll_interval=poll_interval,
+        max_jobs=max_jobs,
+        exit_when_idle=exit_when_idle,
+    )
+    print(f"Worker processed {processed} job(s).", file=sys.stderr)
+    return 0
+
+
 def main(argv: list[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
 
+    if args.command == "worker":
+        return _cmd_worker(
+            queue_path=Path(args.queue),
+            worker_id=args.worker_id,
+            lease_sec=args.lease_sec,
+            poll_interval=args.poll_interval,
+            max_jobs=args.max_jobs,
+            exit_when_idle=args.exit_when_idle,
+        )
+
     config_path = Path(args.config)
 
     if args.command == "list":
-        return _cmd_list(config_path=config_path, limit=args.limit)
+        return _cmd_list(
+            config_path=config_path,
+            limit=args.limit,
+            details=args.details,
+            sort=args.sort,
+            min_bytes=args.min_bytes,
+            refresh=args.refresh,
+        )
 
     if args.command == "run":
         return _cmd_run(
@@ -104,6 +463,56 @@ def main(argv: list[str] | None = None) -> int:
             limit=args.limit,
             dry_run=args.dry_run,
             max_iterations=args.max_iterations,
+            sort=args.sort,
+            min_bytes=args.min_bytes,
+            refresh=args.refresh,
+            progress=args.progress,
+            metrics_file=args.metrics_file,
+            metrics_interval=args.metrics_interval,
+        )
+
+    if args.command == "matrix":
+        return _cmd_matrix(
+            config_path=config_path,
+            llm_overrides=args.llm,
+            challenge=args.challenge,
+            limit=args.limit,
+            dry_run=args.dry_run,
+            max_iterations=args.max_iterations,
+            parallel=args.parallel,
+            prover_slots=args.prover_slots,
+            sort=args.sort,
+            min_bytes=args.min_bytes,
+            refresh=args.refresh,
+            progress=args.progress,
+            metrics_file=args.metrics_file,
+            metrics_interval=args.metrics_interval,
+        )
+
+    if args.command == "serve":
+        return _cmd_serve(
+            config_path=config_path,
+            queue_path=Path(args.queue),
+            challenge=args.challenge,
+            limit=args.limit,
+            dry_run=args.dry_run,
+            max_iterations=args.max_iterations,
+            lease_sec=args.lease_sec,
+            poll_interval=args.poll_interval,
+            wait=not args.no_wait,
+            sort=args.sort,
+            min_bytes=args.min_bytes,
+            refresh=args.refresh,
+        )
+
+    if args.command == "index":
+        return _cmd_index(config_path=config_path, rebuild=args.rebuild, query=args.query)
+
+    if args.command == "materialize":
+        return _cmd_materialize(
+            config_path=config_path,
+            iteration_dir=Path(args.iteration_dir),
+            dest=Path(args.dest) if args.dest else None,
         )
 
     parser.error(f"Unknown command: {args.command}")
@@ -111,9 +520,18 @@ def main(argv: list[str] | None = None) -> int:
 
 
 class _NoopLLMClient:
-    def complete_json(self, system_prompt: str, user_prompt: str):
+    def complete_json(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float | None = None,
+        schema: dict[str, Any] | None = None,
+    ):
         raise RuntimeError("Noop LLM client should not be used in list mode")
 
+    def warm_up(self, prompt_chars: int) -> None:
+        return None
+
 
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+ENV_CACHE_DIR = "EVMBENCH_SOLC_CACHE_DIR"
+ENV_WORKSPACE = "EVMBENCH_SOLC_WORKSPACE"
+ENV_SOURCE_HASH = "EVMBENCH_SOLC_SOURCE_HASH"
+ENV_STATS_FILE = "EVMBENCH_SOLC_STATS_FILE"
+
+_SOURCE_SUFFIXES = {".sol"}
+_SOURCE_NAMES = {"remappings.txt", "foundry.toml", "hardhat.config.js", "hardhat.config.ts"}
+# node_modules stays in: imported dependency sources are part of what solc compiles.
+_SKIP_DIRS = {".certora_internal", ".git"}
+_WORKSPACE_MARK = "@@EVMBENCH_WORKSPACE@@"
+_CWD_MARK = "@@EVMBENCH_CWD@@"
+_PASSTHROUGH_FLAGS = {"--version", "--help", "--license", "-h"}
+
+
+def source_hash(workspace_dir: Path) -> str:
+    sources: list[Path] = []
+    for root, dirs, files in os.walk(workspace_dir):
+        dirs[:] = [name for name in dirs if name not in _SKIP_DIRS and not name.startswith("emv-")]
+        for name in files:
+            if Path(name).suffix in _SOURCE_SUFFIXES or name in _SOURCE_NAMES:
+                sources.append(Path(root) / name)
+
+    digest = hashlib.sha256()
+    for path in sorted(sources, key=lambda item: item.relative_to(workspace_dir).as_posix()):
+        digest.update(path.relative_to(workspace_dir).as_posix().encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(hashlib.sha256(path.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+class CompileCache:
+    def __init__(self, root: Path, solc_names: list[str]):
+        self.root = root
+        self.solc_names = solc_names
+        self.bin_dir = root / "bin"
+
+    def _write_shims(self, search_path: str) -> bool:
+        package_parent = Path(__file__).resolve().parent.parent
+        written = False
+        for name in self.solc_names:
+            real = shutil.which(name, path=search_path)
+            if real is None:
+                continue
+            shim = self.bin_dir / name
+            script = (
+                "#!/bin/sh\n"
+                f'PYTHONPATH="{package_parent}${{PYTHONPATH:+:$PYTHONPATH}}" '
+                f'exec "{sys.executable}" -m evmbench_certora_harness.compile_cache '
+                f'--real "{real}" -- "$@"\n'
+            )
+            if not shim.exists() or shim.read_text(encoding="utf-8") != script:
+                self.bin_dir.mkdir(parents=True, exist_ok=True)
+                tmp = shim.with_name(f".{name}.{os.getpid()}")
+                tmp.write_text(script, encoding="utf-8")
+                tmp.chmod(0o755)
+                os.replace(tmp, shim)
+            written = True
+        return written
+
+    def prepare(self, workspace_dir: Path, stats_file: Path | None = None) -> dict[str, str] | None:
+        env = dict(os.environ)
+        search_path = os.pathsep.join(
+            entry for entry in env.get("PATH", "").split(os.pathsep) if Path(entry) != self.bin_dir
+        )
+        if not self._write_shims(search_path):
+            return None
+
+        env["PATH"] = os.pathsep.join([str(self.bin_dir), search_path])
+        env[ENV_CACHE_DIR] = str(self.root)
+        env[ENV_WORKSPACE] = str(workspace_dir.resolve())
+        env[ENV_SOURCE_HASH] = source_hash(workspace_dir)
+        if stats_file is not None:
+            env[ENV_STATS_FILE] = str(stats_file)
+        return env
+
+
+def read_stats(stats_file: Path) -> dict[str, int]:
+    stats = {"hits": 0, "misses": 0}
+    if not stats_file.is_file():
+        return stats
+    for line in stats_file.read_text(encoding="utf-8").splitlines():
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        stats["hits" if event.get("hit") else "misses"] += 1
+    return stats
+
+
+def _normalize(text: str, workspace: str, cwd: str) -> str:
+    # Replace the longer path first so a cwd nested in the workspace keeps its suffix.
+    pairs = sorted([(workspace, _WORKSPACE_MARK), (cwd, _CWD_MARK)], key=lambda item: -len(item[0]))
+    for path, mark in pairs:
+        if path:
+            text = text.replace(path, mark)
+    return text
+
+
+def _denormalize(text: str, workspace: str, cwd: str) -> str:
+    return text.replace(_WORKSPACE_MARK, workspace).replace(_CWD_MARK, cwd)
+
+
+def _output_dir(args: list[str]) -> str | None:
+    for idx, arg in enumerate(args):
+        if arg in {"-o", "--output-dir"} and idx + 1 < len(args):
+            return args[idx + 1]
+        if arg.startswith("--output-dir="):
+            return arg.split("=", 1)[1]
+    return None
+
+
+def _solc_version(cache_root: Path, real: str) -> str:
+    stat = os.stat(real)
+    marker = cache_root / "versions" / hashlib.sha256(
+        f"{real}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8")
+    ).hexdigest()
+    if marker.is_file():
+        return marker.read_text(encoding="utf-8")
+    version = subprocess.run([real, "--version"], capture_output=True, text=True, check=False).stdout
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    marker.write_text(version, encoding="utf-8")
+    return version
+
+
+def _record(event: dict[str, Any]) -> None:
+    stats_file = os.environ.get(ENV_STATS_FILE)
+    if not stats_file:
+        return
+    with open(stats_file, "a", encoding="utf-8") as handle:
+        handle.write(json.dumps(event) + "\n")
+
+
+def _run_cached(real: str, args: list[str]) -> int:
+    cache_root = Path(os.environ[ENV_CACHE_DIR])
+    workspace = os.environ.get(ENV_WORKSPACE, "")
+    cwd = os.getcwd()
+
+    stdin_data = ""
+    if "--standard-json" in args or "-" in args:
+        stdin_data = sys.stdin.read()
+
+    key_material = {
+        "version": _solc_version(cache_root, real),
+        "args": [_normalize(arg, workspace, cwd) for arg in args],
+        "stdin": _normalize(stdin_data, workspace, cwd),
+        "sources": os.environ.get(ENV_SOURCE_HASH, ""),
+    }
+    key = hashlib.sha256(json.dumps(key_material, sort_keys=True).encode("utf-8")).hexdigest()
+    entry_dir = cache_root / "entries" / key[:2] / key
+    out_dir = _output_dir(args)
+
+    if (entry_dir / "meta.json").is_file():
+        meta = json.loads((entry_dir / "meta.json").read_text(encoding="utf-8"))
+        if out_dir is not None:
+            target = Path(out_dir)
+            for rel in meta.get("outputs", []):
+                dest = target / rel
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                text = (entry_dir / "out" / rel).read_text(encoding="utf-8")
+                dest.write_text(_denormalize(text, workspace, cwd), encoding="utf-8")
+        sys.stdout.write(_denormalize((entry_dir / "stdout").read_text(encoding="utf-8"), workspace, cwd))
+        sys.stderr.write(_denormalize((entry_dir / "stderr").read_text(encoding="utf-8"), workspace, cwd))
+        _record({"key": key, "hit": True})
+        return int(meta.get("exit_code", 0))
+
+    proc = subprocess.run([real, *args], input=stdin_data or None, capture_output=True, text=True, check=False)
+    sys.stdout.write(proc.stdout)
+    sys.stderr.write(proc.stderr)
+    _record({"key": key, "hit": False})
+    if proc.returncode != 0:
+        # Failed compilations are cheap to reproduce and may depend on transient state.
+        return proc.returncode
+
+    outputs: list[str] = []
+    staging = Path(tempfile.mkdtemp(prefix=".tmp-", dir=str(cache_root)))
+    try:
+        if out_dir is not None and Path(out_dir).is_dir():
+            for path in sorted(Path(out_dir).rglob("*")):
+                if not path.is_file():
+                    continue
+                rel = path.relative_to(out_dir).as_posix()
+                dest = staging / "out" / rel
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                text = path.read_text(encoding="utf-8", errors="ignore")
+                dest.write_text(_normalize(text, workspace, cwd), encoding="utf-8")
+                outputs.append(rel)
+        (staging / "stdout").write_text(_normalize(proc.stdout, workspace, cwd), encoding="utf-8")
+        (staging / "stderr").write_text(_normalize(proc.stderr, workspace, cwd), encoding="utf-8")
+        (staging / "meta.json").write_text(
+            json.dumps({"exit_code": proc.returncode, "outputs": outputs}), encoding="utf-8"
+        )
+        entry_dir.parent.mkdir(parents=True, exist_ok=True)
+        os.rename(staging, entry_dir)
+    except OSError:
+        # Another process stored the same key first; its entry is equivalent.
+        shutil.rmtree(staging, ignore_errors=True)
+    return proc.returncode
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if len(argv) < 2 or argv[0] != "--real":
+        print("usage: python -m evmbench_certora_harness.compile_cache --real SOLC -- [solc args]", file=sys.stderr)
+        return 2
+    real = argv[1]
+    args = argv[3:] if argv[2:3] == ["--"] else argv[2:]
+
+    if ENV_CACHE_DIR not in os.environ or _PASSTHROUGH_FLAGS.intersection(args):
+        os.execv(real, [real, *args])
+    return _run_cached(real, args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Any
 
@@ -16,6 +16,13 @@ class LLMConfig:
     timeout_sec: int = 120
     api_key_env: str = "OPENAI_API_KEY"
     base_url: str | None = None
+    keep_alive: str | int | None = "30m"
+    num_ctx: int | None = None
+    num_ctx_max: int = 65536
+    endpoints: list[str] = field(default_factory=list)
+    warmup: bool = True
+    structured_output: bool = True
+    reask_attempts: int = 1
 
 
 @dataclass
@@ -29,6 +36,54 @@ class CertoraConfig:
     failure_markers: list[str] = field(
         default_factory=lambda: ["VIOLATION", "FAILED", "ERROR", "Exception", "Syntax"]
     )
+    executor: str = "subprocess"
+    pool_size: int = 2
+    pool_max_jobs: int = 20
+    pool_setup_command: str | None = None
+    pool_preload: list[str] = field(default_factory=list)
+
+
+@dataclass
+class ArtifactsConfig:
+    enabled: bool = False
+    compression: str = "auto"
+    keep_workspace: bool = False
+    store_dir: Path | None = None
+
+
+@dataclass
+class CompileCacheConfig:
+    enabled: bool = False
+    cache_dir: Path | None = None
+    solc_names: list[str] = field(default_factory=lambda: ["solc"])
+
+
+@dataclass
+class RetrievalConfig:
+    enabled: bool = False
+    top_k: int = 2
+    min_score: float = 0.1
+    max_spec_chars: int = 6000
+    exclude_same_challenge: bool = True
+    index_path: Path | None = None
+
+
+@dataclass
+class CorpusConfig:
+    enabled: bool = False
+    manifest_path: Path | None = None
+    sort: str = "name"
+    min_bytes: int = 0
+
+
+@dataclass
+class ConvergenceConfig:
+    enabled: bool = False
+    patience: int = 3
+    cycle_window: int = 4
+    action: str = "escalate"
+    escalate_temperature: float = 0.7
+    max_escalations: int = 1
 
 
 @dataclass
@@ -50,6 +105,12 @@ class HarnessConfig:
     system_prompt_path: Path | None = Path("prompts/system_prompt.md")
     llm: LLMConfig = field(default_factory=LLMConfig)
     certora: CertoraConfig = field(default_factory=CertoraConfig)
+    artifacts: ArtifactsConfig = field(default_factory=ArtifactsConfig)
+    compile_cache: CompileCacheConfig = field(default_factory=CompileCacheConfig)
+    retrieval: RetrievalConfig = field(default_factory=RetrievalConfig)
+    convergence: ConvergenceConfig = field(default_factory=ConvergenceConfig)
+    corpus: CorpusConfig = field(default_factory=CorpusConfig)
+    matrix: list[dict[str, Any]] = field(default_factory=list)
 
 
 def _as_path(value: str | Path) -> Path:
@@ -62,6 +123,13 @@ def _resolve_relative(path: Path, base_dir: Path) -> Path:
     return (base_dir / path).resolve()
 
 
+def _coerce_keep_alive(value: Any) -> str | int | None:
+    # Ollama accepts a duration string ("30m") or a number of seconds (-1 keeps the model loaded).
+    if value is None or isinstance(value, int):
+        return value
+    return str(value)
+
+
 def _coerce_llm(data: dict[str, Any]) -> LLMConfig:
     return LLMConfig(
         provider=str(data.get("provider", "openai")),
@@ -71,10 +139,29 @@ def _coerce_llm(data: dict[str, Any]) -> LLMConfig:
         timeout_sec=int(data.get("timeout_sec", 120)),
         api_key_env=str(data.get("api_key_env", "OPENAI_API_KEY")),
         base_url=data.get("base_url"),
+        keep_alive=_coerce_keep_alive(data.get("keep_alive", "30m")),
+        num_ctx=int(data["num_ctx"]) if data.get("num_ctx") else None,
+        num_ctx_max=int(data.get("num_ctx_max", 65536)),
+        endpoints=[str(item) for item in data.get("endpoints", [])],
+        warmup=bool(data.get("warmup", True)),
+        structured_output=bool(data.get("structured_output", True)),
+        reask_attempts=int(data.get("reask_attempts", 1)),
     )
 
 
+def merge_llm_config(base: LLMConfig, override: dict[str, Any]) -> LLMConfig:
+    merged = asdict(base)
+    if "provider" in override and override["provider"] != base.provider and "base_url" not in override:
+        # A base_url only makes sense for the provider it was written for.
+        merged["base_url"] = None
+    merged.update(override)
+    return _coerce_llm(merged)
+
+
 def _coerce_certora(data: dict[str, Any]) -> CertoraConfig:
+    executor = str(data.get("executor", "subprocess"))
+    if executor not in {"subprocess", "warm-pool"}:
+        raise ValueError(f"Unsupported certora.executor: {executor}")
     return CertoraConfig(
         spec_path=str(data.get("spec_path", "specs/AutoSpec.cvl")),
         command_template=str(
@@ -92,6 +179,66 @@ def _coerce_certora(data: dict[str, Any]) -> CertoraConfig:
                 "failure_markers", ["VIOLATION", "FAILED", "ERROR", "Exception", "Syntax"]
             )
         ),
+        executor=executor,
+        pool_size=int(data.get("pool_size", 2)),
+        pool_max_jobs=int(data.get("pool_max_jobs", 20)),
+        pool_setup_command=data.get("pool_setup_command"),
+        pool_preload=[str(item) for item in data.get("pool_preload", [])],
+    )
+
+
+def _coerce_artifacts(data: dict[str, Any]) -> ArtifactsConfig:
+    store_dir = data.get("store_dir")
+    return ArtifactsConfig(
+        enabled=bool(data.get("enabled", False)),
+        compression=str(data.get("compression", "auto")),
+        keep_workspace=bool(data.get("keep_workspace", False)),
+        store_dir=_as_path(store_dir) if store_dir else None,
+    )
+
+
+def _coerce_compile_cache(data: dict[str, Any]) -> CompileCacheConfig:
+    cache_dir = data.get("cache_dir")
+    return CompileCacheConfig(
+        enabled=bool(data.get("enabled", False)),
+        cache_dir=_as_path(cache_dir) if cache_dir else None,
+        solc_names=list(data.get("solc_names", ["solc"])),
+    )
+
+
+def _coerce_retrieval(data: dict[str, Any]) -> RetrievalConfig:
+    index_path = data.get("index_path")
+    return RetrievalConfig(
+        enabled=bool(data.get("enabled", False)),
+        top_k=int(data.get("top_k", 2)),
+        min_score=float(data.get("min_score", 0.1)),
+        max_spec_chars=int(data.get("max_spec_chars", 6000)),
+        exclude_same_challenge=bool(data.get("exclude_same_challenge", True)),
+        index_path=_as_path(index_path) if index_path else None,
+    )
+
+
+def _coerce_corpus(data: dict[str, Any]) -> CorpusConfig:
+    manifest_path = data.get("manifest_path")
+    return CorpusConfig(
+        enabled=bool(data.get("enabled", False)),
+        manifest_path=_as_path(manifest_path) if manifest_path else None,
+        sort=str(data.get("sort", "name")),
+        min_bytes=int(data.get("min_bytes", 0)),
+    )
+
+
+def _coerce_convergence(data: dict[str, Any]) -> ConvergenceConfig:
+    action = str(data.get("action", "escalate"))
+    if action not in {"stop", "escalate"}:
+        raise ValueError(f"Unsupported convergence.action: {action}")
+    return ConvergenceConfig(
+        enabled=bool(data.get("enabled", False)),
+        patience=int(data.get("patience", 3)),
+        cycle_window=int(data.get("cycle_window", 4)),
+        action=action,
+        escalate_temperature=float(data.get("escalate_temperature", 0.7)),
+        max_escalations=int(data.get("max_escalations", 1)),
     )
 
 
@@ -104,6 +251,11 @@ def load_config(path: str | Path) -> HarnessConfig:
 
     llm_cfg = _coerce_llm(dict(raw.get("llm", {})))
     certora_cfg = _coerce_certora(dict(raw.get("certora", {})))
+    artifacts_cfg = _coerce_artifacts(dict(raw.get("artifacts", {})))
+    compile_cache_cfg = _coerce_compile_cache(dict(raw.get("compile_cache", {})))
+    retrieval_cfg = _coerce_retrieval(dict(raw.get("retrieval", {})))
+    convergence_cfg = _coerce_convergence(dict(raw.get("convergence", {})))
+    corpus_cfg = _coerce_corpus(dict(raw.get("corpus", {})))
 
     cfg = HarnessConfig(
         name=str(raw.get("name", "evmbench-certora-agent-harness")),
@@ -124,11 +276,41 @@ def load_config(path: str | Path) -> HarnessConfig:
         system_prompt_path=_as_path(raw.get("system_prompt_path", "prompts/system_prompt.md")),
         llm=llm_cfg,
         certora=certora_cfg,
+        artifacts=artifacts_cfg,
+        compile_cache=compile_cache_cfg,
+        retrieval=retrieval_cfg,
+        convergence=convergence_cfg,
+        corpus=corpus_cfg,
+        matrix=[dict(item) for item in raw.get("matrix", [])],
     )
 
     cfg.challenge_root = _resolve_relative(cfg.challenge_root, base_dir)
     cfg.output_dir = _resolve_relative(cfg.output_dir, base_dir)
 
+    if cfg.artifacts.store_dir is None:
+        cfg.artifacts.store_dir = cfg.output_dir / ".store"
+    else:
+        cfg.artifacts.store_dir = _resolve_relative(cfg.artifacts.store_dir, base_dir)
+
+    if cfg.compile_cache.cache_dir is None:
+        cfg.compile_cache.cache_dir = cfg.output_dir / ".solc_cache"
+    else:
+        cfg.compile_cache.cache_dir = _resolve_relative(cfg.compile_cache.cache_dir, base_dir)
+
+    if cfg.retrieval.index_path is None:
+        cfg.retrieval.index_path = cfg.output_dir / ".spec_index.json"
+    else:
+        cfg.retrieval.index_path = _resolve_relative(cfg.retrieval.index_path, base_dir)
+
+    if cfg.corpus.manifest_path is None:
+        cfg.corpus.manifest_path = cfg.output_dir / ".corpus.json"
+    else:
+        cfg.corpus.manifest_path = _resolve_relative(cfg.corpus.manifest_path, base_dir)
+
+    cfg.certora.pool_preload = [
+        str(_resolve_relative(_as_path(item), base_dir)) for item in cfg.certora.pool_preload
+    ]
+
     if cfg.system_prompt_path is not None:
         cfg.system_prompt_path = _resolve_relative(cfg.system_prompt_path, base_dir)
 
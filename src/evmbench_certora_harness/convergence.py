@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import deque
+from dataclasses import dataclass
+
+from .certora import CertoraResult, is_broken_spec_output
+
+_ERROR_LINE_RE = re.compile(r"error|exception|syntax|unexpected|unknown|cannot|violated|failed", re.IGNORECASE)
+_VOLATILE_RE = re.compile(r"0x[0-9a-fA-F]+|\d+(?:\.\d+)?|/[^\s:'\"]+|https?://\S+")
+_VERIFIED_RE = re.compile(r"\bVerified\b")
+_VIOLATED_RE = re.compile(r"\bViolated\b")
+
+
+@dataclass
+class ProgressObservation:
+    index: int
+    spec_hash: str
+    status: str
+    error_signature: str
+    verified: int
+    violated: int
+    broken: bool
+
+    @property
+    def score(self) -> tuple[int, int, int]:
+        # A spec that type-checks beats any broken one; then more decided rules, then more proofs.
+        return (0 if self.broken else 1, self.verified + self.violated, self.verified)
+
+
+def error_signature(result: CertoraResult, max_lines: int = 6) -> str:
+    lines: list[str] = []
+    for line in f"{result.stdout}\n{result.stderr}".splitlines():
+        if not _ERROR_LINE_RE.search(line):
+            continue
+        normalized = " ".join(_VOLATILE_RE.sub("#", line).split())
+        if normalized and normalized not in lines:
+            lines.append(normalized)
+        if len(lines) >= max_lines:
+            break
+    material = f"{result.status}|{result.exit_code}|" + "\n".join(sorted(lines))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+
+
+def observe_parse_error(index: int, message: str) -> ProgressObservation:
+    normalized = " ".join(_VOLATILE_RE.sub("#", message).split())
+    return ProgressObservation(
+        index=index,
+        spec_hash="",
+        status="llm-parse-error",
+        error_signature=hashlib.sha256(f"llm-parse-error|{normalized}".encode("utf-8")).hexdigest()[:16],
+        verified=0,
+        violated=0,
+        broken=True,
+    )
+
+
+def observe_result(index: int, spec_hash: str, result: CertoraResult) -> ProgressObservation:
+    combined = f"{result.stdout}\n{result.stderr}"
+    return ProgressObservation(
+        index=index,
+        spec_hash=spec_hash,
+        status=result.status,
+        error_signature=error_signature(result),
+        verified=len(_VERIFIED_RE.findall(combined)),
+        violated=len(_VIOLATED_RE.findall(combined)),
+        broken=is_broken_spec_output(combined) or result.status == "timeout",
+    )
+
+
+class ProgressTracker:
+    def __init__(self, patience: int = 3, cycle_window: int = 4):
+        self.patience = max(1, patience)
+        self.cycle_window = max(2, cycle_window)
+        self.reset()
+
+    def reset(self) -> None:
+        self.best: tuple[int, int, int] | None = None
+        self.since_improvement = 0
+        self.recent: deque[str] = deque(maxlen=self.cycle_window)
+        self.recent_specs: deque[str] = deque(maxlen=self.cycle_window)
+
+    def observe(self, observation: ProgressObservation) -> str | None:
+        if self.best is None or observation.score > self.best:
+            self.best = observation.score
+            self.since_improvement = 0
+        else:
+            self.since_improvement += 1
+
+        state = observation.error_signature
+        # Returning to an earlier spec counts as a cycle even if the prover output differs
+        # (e.g. a timeout one time and a violation the next).
+        spec_seen = bool(observation.spec_hash) and observation.spec_hash in self.recent_specs
+        repeated = state in self.recent or spec_seen
+        self.recent.append(state)
+        if observation.spec_hash:
+            self.recent_specs.append(observation.spec_hash)
+
+        # A repeated failure state with no progress in between means the model is oscillating.
+        if repeated and self.since_improvement >= 2:
+            return "cycle"
+        if self.since_improvement >= self.patience:
+            return "stagnation"
+        return None
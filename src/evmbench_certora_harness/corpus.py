@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import secrets
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+MANIFEST_VERSION = 1
+SORT_KEYS = ("name", "size", "sol-size", "files")
+
+_SKIP_DIRS = {".git", "node_modules", ".certora_internal", "out", "cache"}
+
+
+@dataclass
+class ChallengeRecord:
+    id: str
+    path: str
+    file_count: int
+    sol_file_count: int
+    total_bytes: int
+    sol_bytes: int
+    content_hash: str
+    dir_mtime: float
+    scanned_at: float
+
+
+def scan_challenge(challenge_id: str, path: Path) -> ChallengeRecord:
+    digest = hashlib.sha256()
+    file_count = sol_file_count = total_bytes = sol_bytes = 0
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted(name for name in dirs if name not in _SKIP_DIRS and not name.startswith("emv-"))
+        for name in sorted(files):
+            file_path = Path(root) / name
+            try:
+                data = file_path.read_bytes()
+            except OSError:
+                continue
+            rel = file_path.relative_to(path).as_posix()
+            digest.update(rel.encode("utf-8") + b"\0")
+            digest.update(hashlib.sha256(data).digest())
+            file_count += 1
+            total_bytes += len(data)
+            if name.endswith(".sol"):
+                sol_file_count += 1
+                sol_bytes += len(data)
+    return ChallengeRecord(
+        id=challenge_id,
+        path=str(path),
+        file_count=file_count,
+        sol_file_count=sol_file_count,
+        total_bytes=total_bytes,
+        sol_bytes=sol_bytes,
+        content_hash=digest.hexdigest(),
+        dir_mtime=path.stat().st_mtime,
+        scanned_at=time.time(),
+    )
+
+
+class CorpusManifest:
+    def __init__(self, manifest_path: Path, root: Path, glob: str):
+        self.manifest_path = manifest_path
+        self.root = root
+        self.glob = glob
+        self.records: dict[str, ChallengeRecord] = {}
+        self.root_mtime: float | None = None
+        self._loaded = False
+        self._load()
+
+    def _load(self) -> None:
+        if not self.manifest_path.is_file():
+            return
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return
+        if data.get("version") != MANIFEST_VERSION:
+            return
+        if data.get("root") != str(self.root) or data.get("glob") != self.glob:
+            return
+        self.root_mtime = data.get("root_mtime")
+        self.records = {item["id"]: ChallengeRecord(**item) for item in data.get("challenges", [])}
+        self._loaded = True
+
+    def save(self) -> None:
+        payload = {
+            "version": MANIFEST_VERSION,
+            "root": str(self.root),
+            "glob": self.glob,
+            "root_mtime": self.root_mtime,
+            "challenges": [asdict(record) for _, record in sorted(self.records.items())],
+        }
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        # Concurrent `run`/`serve` processes share the manifest, so each writer needs its own temp file.
+        tmp_path = self.manifest_path.with_name(
+            f".{self.manifest_path.name}.{os.getpid()}.{secrets.token_hex(4)}.tmp"
+        )
+        try:
+            tmp_path.write_text(json.dumps(payload, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+            tmp_path.replace(self.manifest_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _candidate_dirs(self) -> dict[str, Path] | None:
+        root_mtime = self.root.stat().st_mtime if self.root.is_dir() else None
+        # A single-level glob only picks up new challenges when the root directory changes,
+        # so an unchanged root mtime lets us skip listing the (possibly remote) root entirely.
+        single_level = "/" not in self.glob and "**" not in self.glob
+        if self._loaded and single_level and root_mtime is not None and root_mtime == self.root_mtime:
+            return None
+        self.root_mtime = root_mtime
+        if root_mtime is None:
+            return {}
+        return {
+            path.relative_to(self.root).as_posix(): path
+            for path in sorted(self.root.glob(self.glob))
+            if path.is_dir()
+        }
+
+    def refresh(self, full: bool = False) -> int:
+        was_loaded, root_mtime = self._loaded, self.root_mtime
+        candidates = self._candidate_dirs()
+        if candidates is None:
+            candidates = {record_id: Path(record.path) for record_id, record in self.records.items()}
+        rescanned = removed = 0
+        for challenge_id in list(self.records):
+            if challenge_id not in candidates:
+                del self.records[challenge_id]
+                removed += 1
+        for challenge_id, path in candidates.items():
+            record = self.records.get(challenge_id)
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                removed += self.records.pop(challenge_id, None) is not None
+                continue
+            # Directory mtime only tracks direct entries; `full` rescans nested edits too.
+            if record is not None and record.dir_mtime == mtime and not full:
+                continue
+            self.records[challenge_id] = scan_challenge(challenge_id, path)
+            rescanned += 1
+        self._loaded = True
+        # Every run/list/serve refreshes; only write when something changed so concurrent
+        # processes on one output_dir mostly just read the manifest.
+        if rescanned or removed or not was_loaded or self.root_mtime != root_mtime:
+            self.save()
+        return rescanned
+
+    def select(
+        self,
+        sort: str = "name",
+        min_bytes: int | None = None,
+        limit: int | None = None,
+    ) -> list[ChallengeRecord]:
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unsupported sort key: {sort} (expected one of {', '.join(SORT_KEYS)})")
+        records = sorted(self.records.values(), key=lambda record: record.id)
+        if min_bytes:
+            records = [record for record in records if record.total_bytes >= min_bytes]
+        # Size-based orders put the biggest challenges first so they start earliest.
+        if sort == "size":
+            records.sort(key=lambda record: record.total_bytes, reverse=True)
+        elif sort == "sol-size":
+            records.sort(key=lambda record: record.sol_bytes, reverse=True)
+        elif sort == "files":
+            records.sort(key=lambda record: record.file_count, reverse=True)
+        if limit is not None:
+            records = records[:limit]
+        return records
+
+    def lookup(self, name: str) -> ChallengeRecord | None:
+        key = Path(name).as_posix().strip("/")
+        record = self.records.get(key)
+        if record is not None:
+            return record
+        matches = [record for record in self.records.values() if Path(record.id).name == key]
+        return matches[0] if len(matches) == 1 else None
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import hashlib
+import re
+
+_TOKEN_RE = re.compile(
+    r'"(?:\\.|[^"\\])*"'
+    r"|0[xX][0-9a-fA-F]+"
+    r"|[A-Za-z_$][\w$]*"
+    r"|\d+"
+    r"|==>|<=>|=>|->|==|!=|<=|>=|&&|\|\||\+\+|--|<<|>>"
+    r"|\S"
+)
+
+
+def strip_comments(text: str) -> str:
+    out: list[str] = []
+    idx = 0
+    length = len(text)
+    while idx < length:
+        char = text[idx]
+        if char == '"':
+            end = idx + 1
+            while end < length and text[end] != '"':
+                end += 2 if text[end] == "\\" else 1
+            out.append(text[idx : end + 1])
+            idx = end + 1
+        elif text.startswith("//", idx):
+            newline = text.find("\n", idx)
+            idx = length if newline < 0 else newline
+        elif text.startswith("/*", idx):
+            close = text.find("*/", idx + 2)
+            idx = length if close < 0 else close + 2
+            out.append(" ")
+        else:
+            out.append(char)
+            idx += 1
+    return "".join(out)
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(strip_comments(text))
+
+
+def split_declarations(tokens: list[str]) -> list[list[str]]:
+    declarations: list[list[str]] = []
+    current: list[str] = []
+    depth = 0
+    for pos, token in enumerate(tokens):
+        current.append(token)
+        if token in {"(", "{", "["}:
+            depth += 1
+        elif token in {")", "}", "]"}:
+            depth = max(0, depth - 1)
+
+        if depth != 0:
+            continue
+        if token == ";":
+            declarations.append(current)
+            current = []
+        elif token == "}":
+            # `filtered { ... } { body }` and `invariant ... { preserved ... }` continue
+            # the same declaration with another block.
+            if pos + 1 < len(tokens) and tokens[pos + 1] == "{":
+                continue
+            declarations.append(current)
+            current = []
+    if current:
+        declarations.append(current)
+    return declarations
+
+
+def normalize_spec(text: str) -> str:
+    declarations = [" ".join(tokens) for tokens in split_declarations(tokenize(text))]
+    return "\n".join(sorted(declarations))
+
+
+def spec_fingerprint(text: str) -> str:
+    return hashlib.sha256(normalize_spec(text).encode("utf-8")).hexdigest()
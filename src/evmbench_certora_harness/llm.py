@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import json
 import os
-from dataclasses import dataclass
+import re
+import threading
+from dataclasses import dataclass, field
 from typing import Any
 
 import requests
@@ -14,29 +16,157 @@ class LLMError(RuntimeError):
     pass
 
 
+class LLMParseError(LLMError):
+    def __init__(self, message: str, raw_text: str):
+        super().__init__(message)
+        self.raw_text = raw_text
+
+
+RESPONSE_FIELDS = ("spec_path", "certora_command", "summary", "spec")
+
+
+def response_schema(fields: tuple[str, ...] | list[str]) -> dict[str, Any]:
+    return {
+        "type": "object",
+        "properties": {name: {"type": "string"} for name in fields},
+        "required": list(fields),
+        "additionalProperties": False,
+    }
+
+
+RESPONSE_SCHEMA = response_schema(RESPONSE_FIELDS)
+
+
 @dataclass
 class LLMResponse:
     payload: dict[str, Any]
     raw_text: str
+    repairs: list[str] = field(default_factory=list)
+    usage: dict[str, int] = field(default_factory=dict)
+    warnings: list[str] = field(default_factory=list)
 
 
 class BaseLLMClient:
-    def complete_json(self, system_prompt: str, user_prompt: str) -> LLMResponse:
+    def complete_json(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float | None = None,
+        schema: dict[str, Any] | None = None,
+    ) -> LLMResponse:
         raise NotImplementedError
 
-
-def _json_load_with_fallback(raw_text: str) -> dict[str, Any]:
+    def warm_up(self, prompt_chars: int) -> None:
+        return None
+
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*\n(.*?)(?:\n```|$)", re.DOTALL)
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _strip_trailing_comma(out: list[str]) -> bool:
+    pos = len(out) - 1
+    while pos >= 0 and out[pos].isspace():
+        pos -= 1
+    if pos >= 0 and out[pos] == ",":
+        del out[pos]
+        return True
+    return False
+
+
+def repair_json_text(text: str) -> tuple[str, list[str]]:
+    out: list[str] = []
+    repairs: set[str] = set()
+    stack: list[str] = []
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            elif char in _CONTROL_ESCAPES:
+                out.append(_CONTROL_ESCAPES[char])
+                repairs.add("escaped control characters in strings")
+                continue
+            out.append(char)
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+        elif char in "}]":
+            if _strip_trailing_comma(out):
+                repairs.add("removed trailing commas")
+            if stack and stack[-1] == char:
+                stack.pop()
+        out.append(char)
+        if not stack and out and out[-1] in "}]":
+            # Anything after the top-level value is chatter.
+            break
+
+    if in_string or stack:
+        repairs.add("closed truncated output")
+        if escaped:
+            out.pop()
+        if in_string:
+            out.append('"')
+        _strip_trailing_comma(out)
+        if "".join(out).rstrip().endswith(":"):
+            out.append("null")
+        out.extend(reversed(stack))
+    return "".join(out), sorted(repairs)
+
+
+def _json_load_with_fallback(raw_text: str) -> tuple[dict[str, Any], list[str]]:
     try:
-        return json.loads(raw_text)
+        parsed = json.loads(raw_text)
+        if isinstance(parsed, dict):
+            return parsed, []
     except json.JSONDecodeError:
-        start = raw_text.find("{")
-        end = raw_text.rfind("}")
-        if start >= 0 and end > start:
-            try:
-                return json.loads(raw_text[start : end + 1])
-            except json.JSONDecodeError as exc:
-                raise LLMError(f"Model returned invalid JSON: {exc}") from exc
-        raise LLMError("Model returned non-JSON content")
+        pass
+
+    text = raw_text
+    fenced = _FENCE_RE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    start = text.find("{")
+    if start < 0:
+        raise LLMParseError("Model returned non-JSON content", raw_text)
+    repaired, repairs = repair_json_text(text[start:])
+    try:
+        parsed = json.loads(repaired)
+    except json.JSONDecodeError as exc:
+        raise LLMParseError(f"Model returned invalid JSON: {exc}", raw_text) from exc
+    if not isinstance(parsed, dict):
+        raise LLMParseError("Model returned JSON that is not an object", raw_text)
+    return parsed, repairs
+
+
+def _openai_usage(data: dict[str, Any]) -> dict[str, int]:
+    usage = data.get("usage") or {}
+    return {
+        "prompt_tokens": int(usage.get("prompt_tokens") or 0),
+        "completion_tokens": int(usage.get("completion_tokens") or 0),
+    }
+
+
+def payload_problems(payload: dict[str, Any], repairs: list[str] | None = None) -> dict[str, str]:
+    problems: dict[str, str] = {}
+    spec = payload.get("spec")
+    if not isinstance(spec, str) or not spec.strip():
+        problems["spec"] = "missing or empty"
+    elif "closed truncated output" in (repairs or []):
+        problems["spec"] = "truncated (the response hit the output limit)"
+    spec_path = payload.get("spec_path")
+    if spec_path is not None and (not isinstance(spec_path, str) or not spec_path.strip()):
+        problems["spec_path"] = "not a non-empty string"
+    return problems
 
 
 def _normalize_openai_url(base_url: str | None) -> str:
@@ -81,7 +211,13 @@ def _load_api_key(config: LLMConfig, fallback_env: str | None = None) -> tuple[s
 
 
 class MockClient(BaseLLMClient):
-    def complete_json(self, system_prompt: str, user_prompt: str) -> LLMResponse:
+    def complete_json(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float | None = None,
+        schema: dict[str, Any] | None = None,
+    ) -> LLMResponse:
         payload = {
             "spec_path": "specs/AutoSpec.cvl",
             "certora_command": "echo MOCK_CERTORA_OK && true",
@@ -97,19 +233,33 @@ class OpenAIClient(BaseLLMClient):
         self.api_key, _ = _load_api_key(config)
         self.url = _normalize_openai_url(config.base_url)
 
-    def complete_json(self, system_prompt: str, user_prompt: str) -> LLMResponse:
+    def _response_format(self, schema: dict[str, Any] | None) -> dict[str, Any]:
+        if not self.config.structured_output:
+            return {"type": "json_object"}
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": "certora_spec", "strict": True, "schema": schema or RESPONSE_SCHEMA},
+        }
+
+    def complete_json(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float | None = None,
+        schema: dict[str, Any] | None = None,
+    ) -> LLMResponse:
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
         payload = {
             "model": self.config.model,
-            "temperature": self.config.temperature,
+            "temperature": self.config.temperature if temperature is None else temperature,
             "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
-            "response_format": {"type": "json_object"},
+            "response_format": self._response_format(schema),
             "max_tokens": self.config.max_output_tokens,
         }
         response = requests.post(
@@ -127,8 +277,8 @@ class OpenAIClient(BaseLLMClient):
         except (KeyError, IndexError, TypeError) as exc:
             raise LLMError(f"Unexpected OpenAI response shape: {data}") from exc
 
-        parsed = _json_load_with_fallback(raw_text)
-        return LLMResponse(payload=parsed, raw_text=raw_text)
+        parsed, repairs = _json_load_with_fallback(raw_text)
+        return LLMResponse(payload=parsed, raw_text=raw_text, repairs=repairs, usage=_openai_usage(data))
 
 
 class OpenRouterClient(BaseLLMClient):
@@ -137,7 +287,13 @@ class OpenRouterClient(BaseLLMClient):
         self.api_key, self.key_env_name = _load_api_key(config, fallback_env="OPENROUTER_API_KEY")
         self.url = _normalize_openrouter_url(config.base_url)
 
-    def complete_json(self, system_prompt: str, user_prompt: str) -> LLMResponse:
+    def complete_json(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float | None = None,
+        schema: dict[str, Any] | None = None,
+    ) -> LLMResponse:
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -151,7 +307,7 @@ class OpenRouterClient(BaseLLMClient):
 
         payload = {
             "model": self.config.model,
-            "temperature": self.config.temperature,
+            "temperature": self.config.temperature if temperature is None else temperature,
             "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
@@ -174,31 +330,128 @@ class OpenRouterClient(BaseLLMClient):
         except (KeyError, IndexError, TypeError) as exc:
             raise LLMError(f"Unexpected OpenRouter response shape: {data}") from exc
 
-        parsed = _json_load_with_fallback(raw_text)
-        return LLMResponse(payload=parsed, raw_text=raw_text)
+        parsed, repairs = _json_load_with_fallback(raw_text)
+        return LLMResponse(payload=parsed, raw_text=raw_text, repairs=repairs, usage=_openai_usage(data))
+
+
+_CHARS_PER_TOKEN = 3
+_NUM_CTX_STEP = 2048
+_PROMPT_OVERHEAD_TOKENS = 512
+
+
+def _ollama_base(url: str) -> str:
+    return url[: -len("/api/chat")] if url.endswith("/api/chat") else url.rstrip("/")
+
+
+def _needed_tokens(prompt_chars: int, max_output_tokens: int) -> int:
+    return prompt_chars // _CHARS_PER_TOKEN + max_output_tokens + _PROMPT_OVERHEAD_TOKENS
+
+
+def _size_num_ctx(prompt_chars: int, max_output_tokens: int, num_ctx_max: int) -> int:
+    needed = _needed_tokens(prompt_chars, max_output_tokens)
+    # Power-of-two buckets keep the value stable across iterations; Ollama reloads the
+    # model whenever num_ctx changes.
+    bucket = _NUM_CTX_STEP
+    while bucket < needed:
+        bucket *= 2
+    return min(bucket, num_ctx_max)
+
+
+class _OllamaEndpoint:
+    def __init__(self, url: str):
+        self.url = url
+        self.in_flight = 0
+        self.num_ctx = 0
+        self.lock = threading.Lock()
 
 
 class OllamaClient(BaseLLMClient):
     def __init__(self, config: LLMConfig):
         self.config = config
-        self.url = _normalize_ollama_url(config.base_url)
-
-    def complete_json(self, system_prompt: str, user_prompt: str) -> LLMResponse:
-        payload = {
-            "model": self.config.model,
-            "stream": False,
-            "format": "json",
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            "options": {
-                "temperature": self.config.temperature,
-            },
+        urls = config.endpoints or [config.base_url]
+        self.endpoints = [_OllamaEndpoint(_normalize_ollama_url(url)) for url in urls]
+        self.url = self.endpoints[0].url
+        self._lock = threading.Lock()
+        self._next = 0
+
+    def _acquire(self) -> _OllamaEndpoint:
+        with self._lock:
+            # Least busy endpoint first; rotate the starting point so ties spread evenly.
+            count = len(self.endpoints)
+            order = [self.endpoints[(self._next + offset) % count] for offset in range(count)]
+            endpoint = min(order, key=lambda item: item.in_flight)
+            self._next = (self.endpoints.index(endpoint) + 1) % count
+            endpoint.in_flight += 1
+            return endpoint
+
+    def _release(self, endpoint: _OllamaEndpoint) -> None:
+        with self._lock:
+            endpoint.in_flight -= 1
+
+    def _num_ctx_for(self, endpoint: _OllamaEndpoint, prompt_chars: int) -> int:
+        if self.config.num_ctx:
+            return self.config.num_ctx
+        wanted = _size_num_ctx(prompt_chars, self.config.max_output_tokens, self.config.num_ctx_max)
+        with endpoint.lock:
+            # Never shrink: a smaller num_ctx would force a model reload.
+            endpoint.num_ctx = max(endpoint.num_ctx, wanted)
+            return endpoint.num_ctx
+
+    def _options(self, num_ctx: int, temperature: float | None) -> dict[str, Any]:
+        return {
+            "temperature": self.config.temperature if temperature is None else temperature,
+            "num_ctx": num_ctx,
+            "num_predict": self.config.max_output_tokens,
         }
-        response = requests.post(self.url, json=payload, timeout=self.config.timeout_sec)
+
+    def warm_up(self, prompt_chars: int) -> None:
+        if not self.config.warmup:
+            return
+        for endpoint in self.endpoints:
+            payload: dict[str, Any] = {
+                "model": self.config.model,
+                "prompt": "",
+                "stream": False,
+                "options": {"num_ctx": self._num_ctx_for(endpoint, prompt_chars)},
+            }
+            if self.config.keep_alive is not None:
+                payload["keep_alive"] = self.config.keep_alive
+            # An empty generate request only loads the model; run it in the background so
+            # loading overlaps with prompt construction.
+            threading.Thread(
+                target=_post_quietly,
+                args=(f"{_ollama_base(endpoint.url)}/api/generate", payload, self.config.timeout_sec),
+                daemon=True,
+            ).start()
+
+    def complete_json(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float | None = None,
+        schema: dict[str, Any] | None = None,
+    ) -> LLMResponse:
+        prompt_chars = len(system_prompt) + len(user_prompt)
+        endpoint = self._acquire()
+        try:
+            num_ctx = self._num_ctx_for(endpoint, prompt_chars)
+            payload: dict[str, Any] = {
+                "model": self.config.model,
+                "stream": False,
+                "format": (schema or RESPONSE_SCHEMA) if self.config.structured_output else "json",
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                "options": self._options(num_ctx, temperature),
+            }
+            if self.config.keep_alive is not None:
+                payload["keep_alive"] = self.config.keep_alive
+            response = requests.post(endpoint.url, json=payload, timeout=self.config.timeout_sec)
+        finally:
+            self._release(endpoint)
         if response.status_code >= 400:
-            raise LLMError(f"Ollama request failed: {response.status_code} {response.text}")
+            raise LLMError(f"Ollama request failed ({endpoint.url}): {response.status_code} {response.text}")
 
         data = response.json()
         try:
@@ -206,8 +459,28 @@ class OllamaClient(BaseLLMClient):
         except (KeyError, TypeError) as exc:
             raise LLMError(f"Unexpected Ollama response shape: {data}") from exc
 
-        parsed = _json_load_with_fallback(raw_text)
-        return LLMResponse(payload=parsed, raw_text=raw_text)
+        parsed, repairs = _json_load_with_fallback(raw_text)
+        usage = {
+            "prompt_tokens": int(data.get("prompt_eval_count") or 0),
+            "completion_tokens": int(data.get("eval_count") or 0),
+        }
+        warnings: list[str] = []
+        needed = _needed_tokens(prompt_chars, self.config.max_output_tokens)
+        if needed > num_ctx:
+            # Ollama silently drops the oldest prompt tokens once num_ctx is exceeded.
+            warnings.append(
+                f"prompt needs ~{needed} tokens but num_ctx is {num_ctx}; Ollama truncated the "
+                "prompt (raise llm.num_ctx_max or lower max_context_bytes)"
+            )
+        return LLMResponse(payload=parsed, raw_text=raw_text, repairs=repairs, usage=usage, warnings=warnings)
+
+
+def _post_quietly(url: str, payload: dict[str, Any], timeout_sec: int) -> None:
+    try:
+        requests.post(url, json=payload, timeout=timeout_sec)
+    except requests.RequestException:
+        # Warm-up is best effort; the real request reports connection problems.
+        pass
 
 
 def create_llm_client(config: LLMConfig) -> BaseLLMClient:
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable
+
+import yaml
+
+from .agent import HarnessRunner
+from .certora import CertoraResult
+from .config import HarnessConfig, LLMConfig, merge_llm_config
+from .llm import BaseLLMClient, LLMError, create_llm_client
+from .retrieval import SpecIndex
+from .slots import FairSlots
+
+
+# Pairs are comma-separated, so list values use ';' (endpoints=http://a:11434;http://b:11434).
+_LIST_KEYS = {"endpoints"}
+
+
+def _parse_override_value(key: str, value: str) -> Any:
+    if key in _LIST_KEYS:
+        return [item.strip() for item in value.split(";") if item.strip()]
+    try:
+        # Same typing rules as the YAML config: false/true, numbers, null.
+        return yaml.safe_load(value)
+    except yaml.YAMLError:
+        return value
+
+
+def parse_llm_override(text: str) -> dict[str, Any]:
+    if "=" in text:
+        override: dict[str, Any] = {}
+        for item in text.split(","):
+            key, _, value = item.partition("=")
+            override[key.strip()] = _parse_override_value(key.strip(), value.strip())
+        return override
+    # Model names may contain colons (qwen2.5-coder:14b), so only split on the first.
+    provider, _, model = text.partition(":")
+    if not model:
+        raise ValueError(f"Expected PROVIDER:MODEL or key=value pairs, got {text!r}")
+    return {"provider": provider.strip(), "model": model.strip()}
+
+
+def model_label(llm: LLMConfig) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", f"{llm.provider}-{llm.model}")
+
+
+def build_llm_configs(base: LLMConfig, overrides: list[dict[str, Any]]) -> list[LLMConfig]:
+    configs = [merge_llm_config(base, override) for override in overrides]
+    labels = [model_label(item) for item in configs]
+    duplicates = {label for label in labels if labels.count(label) > 1}
+    if duplicates:
+        raise ValueError(f"Duplicate matrix entries: {', '.join(sorted(duplicates))}")
+    return configs
+
+
+def run_matrix(
+    config: HarnessConfig,
+    llm_configs: list[LLMConfig],
+    challenges: list[Path],
+    dry_run: bool = False,
+    max_iterations: int | None = None,
+    parallel: int | None = None,
+    prover_slots: int = 1,
+    client_factory: Callable[[LLMConfig], BaseLLMClient] = create_llm_client,
+    observer: Callable[[str, dict[str, Any]], None] | None = None,
+) -> list[dict[str, Any]]:
+    spec_results: dict[tuple[str, str, str, str], CertoraResult] = {}
+    spec_locks: dict[tuple[str, str, str, str], threading.Lock] = {}
+    context_cache: dict[tuple[Any, ...], str] = {}
+    slots = FairSlots(prover_slots)
+    spec_index = None
+    if config.retrieval.enabled and config.retrieval.index_path is not None:
+        spec_index = SpecIndex(config.retrieval.index_path, config.output_dir)
+
+    runners: dict[str, HarnessRunner] = {}
+    init_errors: dict[str, str] = {}
+    for llm in llm_configs:
+        label = model_label(llm)
+        try:
+            client = client_factory(llm)
+        except LLMError as exc:
+            init_errors[label] = str(exc)
+            continue
+        runners[label] = HarnessRunner(
+            config=replace(config, llm=llm),
+            llm_client=client,
+            dry_run=dry_run,
+            max_iterations_override=max_iterations,
+            run_label=label,
+            spec_results=spec_results,
+            spec_locks=spec_locks,
+            context_cache=context_cache,
+            prover_slots=slots,
+            spec_index=spec_index,
+            observer=observer,
+        )
+
+    def _run_cell(challenge_dir: Path, label: str) -> dict[str, Any]:
+        if label in init_errors:
+            summary = {"status": "llm-init-error", "error": init_errors[label], "iterations": []}
+        else:
+            try:
+                return runners[label]._run_single(challenge_dir)
+            except Exception as exc:  # noqa: BLE001 - one broken cell must not abort the sweep
+                summary = {"status": "error", "error": f"{type(exc).__name__}: {exc}", "iterations": []}
+        if observer is not None:
+            observer("challenge_end", {"challenge": challenge_dir.name, "label": label, "status": summary["status"]})
+        return summary
+
+    # Challenge-major order keeps all models on the same challenge together, so they share the
+    # context cache; a spec already being proved by another model waits for that result instead.
+    cells = [(challenge_dir, model_label(llm)) for challenge_dir in challenges for llm in llm_configs]
+    if observer is not None:
+        observer("run_start", {"total": len(cells)})
+    workers = parallel or max(1, len(llm_configs))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_cell, challenge_dir, label) for challenge_dir, label in cells]
+        summaries = [future.result() for future in futures]
+
+    return [
+        {"challenge": str(challenge_dir), "model": label, "summary": summary}
+        for (challenge_dir, label), summary in zip(cells, summaries)
+    ]
+
+
+def _cell_text(summary: dict[str, Any]) -> str:
+    iterations = summary.get("iterations", [])
+    prover_sec = sum(float(item.get("elapsed_sec", 0.0)) for item in iterations)
+    return f"{summary.get('status', '?')} ({len(iterations)} it, {prover_sec:.0f}s)"
+
+
+def render_table(rows: list[dict[str, Any]]) -> str:
+    challenges: list[str] = []
+    models: list[str] = []
+    cells: dict[tuple[str, str], str] = {}
+    solved: dict[str, int] = {}
+    for row in rows:
+        challenge = Path(row["challenge"]).name
+        if challenge not in challenges:
+            challenges.append(challenge)
+        if row["model"] not in models:
+            models.append(row["model"])
+        cells[(challenge, row["model"])] = _cell_text(row["summary"])
+        if row["summary"].get("status") == "success":
+            solved[row["model"]] = solved.get(row["model"], 0) + 1
+
+    header = ["challenge", *models]
+    body = [[challenge, *(cells.get((challenge, model), "-") for model in models)] for challenge in challenges]
+    body.append(["solved", *(f"{solved.get(model, 0)}/{len(challenges)}" for model in models)])
+    widths = [max(len(line[col]) for line in [header, *body]) for col in range(len(header))]
+
+    def _line(values: list[str]) -> str:
+        return " | ".join(value.ljust(width) for value, width in zip(values, widths)).rstrip()
+
+    separator = "-+-".join("-" * width for width in widths)
+    return "\n".join([_line(header), separator, *(_line(line) for line in body)])
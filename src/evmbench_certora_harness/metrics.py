@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import json
+import math
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, TextIO
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def percentile(samples: list[float], quantile: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    # Nearest-rank: good enough for a few hundred samples and always an observed value.
+    rank = max(1, min(len(ordered), math.ceil(quantile * len(ordered))))
+    return ordered[rank - 1]
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    return f"{seconds / 60:.0f}m"
+
+
+class RunMetrics:
+    def __init__(self, total_challenges: int = 0):
+        self.total_challenges = total_challenges
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self.finished: dict[str, int] = {}
+        self.active: dict[str, dict[str, Any]] = {}
+        self.iterations = 0
+        self.llm_latencies: list[float] = []
+        self.prover_latencies: list[float] = []
+        self.prover_cache_hits = 0
+        self.prover_runs = 0
+        self.solc_hits = 0
+        self.solc_misses = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.llm_errors = 0
+
+    def __call__(self, event: str, data: dict[str, Any]) -> None:
+        if event == "run_start":
+            with self._lock:
+                self.total_challenges += int(data["total"])
+            return
+        key = data["challenge"] if not data.get("label") else f"{data['challenge']} [{data['label']}]"
+        now = time.monotonic()
+        with self._lock:
+            if event == "challenge_start":
+                self.active[key] = {
+                    "phase": "start",
+                    "iteration": 0,
+                    "max_iterations": data.get("max_iterations", 0),
+                    "since": now,
+                }
+            elif event == "phase" and key in self.active:
+                self.active[key].update(phase=data["phase"], iteration=data["iteration"], since=now)
+            elif event == "iteration":
+                self._record_iteration(data["result"])
+            elif event == "llm_error":
+                self.llm_errors += 1
+                self.llm_latencies.append(float(data.get("llm_sec", 0.0)))
+            elif event == "challenge_end":
+                self.active.pop(key, None)
+                status = str(data.get("status", "unknown"))
+                self.finished[status] = self.finished.get(status, 0) + 1
+
+    def _record_iteration(self, result: dict[str, Any]) -> None:
+        self.iterations += 1
+        self.llm_latencies.append(float(result.get("llm_sec", 0.0)))
+        self.prompt_tokens += int(result.get("prompt_tokens", 0))
+        self.completion_tokens += int(result.get("completion_tokens", 0))
+        self.solc_hits += int(result.get("compile_cache_hits", 0))
+        self.solc_misses += int(result.get("compile_cache_misses", 0))
+        if result.get("certora_status") == "llm-parse-error":
+            return
+        if result.get("prover_skipped"):
+            self.prover_cache_hits += 1
+        else:
+            self.prover_runs += 1
+            self.prover_latencies.append(float(result.get("elapsed_sec", 0.0)))
+
+    def snapshot(self) -> dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            done = sum(self.finished.values())
+            prover_lookups = self.prover_runs + self.prover_cache_hits
+            solc_lookups = self.solc_hits + self.solc_misses
+            return {
+                "elapsed_sec": round(now - self.started, 1),
+                "challenges": {
+                    "total": self.total_challenges,
+                    "done": done,
+                    "active": len(self.active),
+                    "queued": max(0, self.total_challenges - done - len(self.active)),
+                },
+                "status": dict(self.finished),
+                "iterations": self.iterations,
+                "llm_errors": self.llm_errors,
+                "llm_latency_sec": self._latency_summary(self.llm_latencies),
+                "prover_latency_sec": self._latency_summary(self.prover_latencies),
+                "cache": {
+                    "prover_hits": self.prover_cache_hits,
+                    "prover_runs": self.prover_runs,
+                    "prover_hit_rate": round(self.prover_cache_hits / prover_lookups, 4) if prover_lookups else 0.0,
+                    "solc_hits": self.solc_hits,
+                    "solc_misses": self.solc_misses,
+                    "solc_hit_rate": round(self.solc_hits / solc_lookups, 4) if solc_lookups else 0.0,
+                },
+                "tokens": {"prompt": self.prompt_tokens, "completion": self.completion_tokens},
+                "active": [
+                    {
+                        "challenge": key,
+                        "phase": state["phase"],
+                        "iteration": state["iteration"],
+                        "max_iterations": state["max_iterations"],
+                        "phase_sec": round(now - state["since"], 1),
+                    }
+                    for key, state in sorted(self.active.items())
+                ],
+            }
+
+    @staticmethod
+    def _latency_summary(samples: list[float]) -> dict[str, float]:
+        summary = {f"p{int(quantile * 100)}": round(percentile(samples, quantile), 3) for quantile in QUANTILES}
+        summary["count"] = len(samples)
+        summary["sum"] = round(sum(samples), 3)
+        return summary
+
+
+def render_prometheus(snapshot: dict[str, Any], prefix: str = "evmbench") -> str:
+    lines: list[str] = []
+
+    def _metric(name: str, kind: str, samples: list[tuple[str, float]]) -> None:
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{prefix}_{name}{labels} {value}")
+
+    challenges = snapshot["challenges"]
+    _metric("challenges", "gauge", [(f'{{state="{state}"}}', challenges[state]) for state in challenges])
+    _metric(
+        "challenge_status_total",
+        "counter",
+        [(f'{{status="{_escape_label(status)}"}}', count) for status, count in sorted(snapshot["status"].items())],
+    )
+    _metric("iterations_total", "counter", [("", snapshot["iterations"])])
+    _metric("llm_errors_total", "counter", [("", snapshot["llm_errors"])])
+    for name in ("llm_latency_sec", "prover_latency_sec"):
+        latency = snapshot[name]
+        metric = name.replace("_sec", "_seconds")
+        _metric(
+            metric,
+            "summary",
+            [(f'{{quantile="{quantile}"}}', latency[f"p{int(quantile * 100)}"]) for quantile in QUANTILES],
+        )
+        lines.append(f"{prefix}_{metric}_sum {latency['sum']}")
+        lines.append(f"{prefix}_{metric}_count {latency['count']}")
+    cache = snapshot["cache"]
+    _metric(
+        "cache_hits_total",
+        "counter",
+        [('{cache="prover"}', cache["prover_hits"]), ('{cache="solc"}', cache["solc_hits"])],
+    )
+    _metric(
+        "cache_misses_total",
+        "counter",
+        [('{cache="prover"}', cache["prover_runs"]), ('{cache="solc"}', cache["solc_misses"])],
+    )
+    _metric(
+        "llm_tokens_total",
+        "counter",
+        [(f'{{kind="{kind}"}}', count) for kind, count in snapshot["tokens"].items()],
+    )
+    _metric(
+        "active_phase_seconds",
+        "gauge",
+        [
+            (
+                f'{{challenge="{_escape_label(item["challenge"])}",phase="{item["phase"]}"}}',
+                item["phase_sec"],
+            )
+            for item in snapshot["active"]
+        ],
+    )
+    return "\n".join(lines) + "\n"
+
+
+def status_lines(snapshot: dict[str, Any]) -> list[str]:
+    challenges = snapshot["challenges"]
+    llm = snapshot["llm_latency_sec"]
+    prover = snapshot["prover_latency_sec"]
+    tokens = snapshot["tokens"]
+    header = (
+        f"[{challenges['done']}/{challenges['total'] or '?'} done, {challenges['active']} active, "
+        f"{challenges['queued']} queued] it={snapshot['iterations']} "
+        f"llm p50/p90={llm['p50']:.0f}/{llm['p90']:.0f}s "
+        f"prover p50/p90={prover['p50']:.0f}/{prover['p90']:.0f}s "
+        f"cache prover={snapshot['cache']['prover_hit_rate']:.0%} solc={snapshot['cache']['solc_hit_rate']:.0%} "
+        f"tok={tokens['prompt'] + tokens['completion']}"
+    )
+    lines = [header]
+    for item in snapshot["active"]:
+        lines.append(
+            f"  {item['challenge']}: it {item['iteration']}/{item['max_iterations']} "
+            f"{item['phase']} {_format_duration(item['phase_sec'])}"
+        )
+    return lines
+
+
+def write_metrics_file(path: Path, snapshot: dict[str, Any]) -> None:
+    if path.suffix == ".json":
+        content = json.dumps(snapshot, indent=2) + "\n"
+    else:
+        content = render_prometheus(snapshot)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write-then-rename so node_exporter never scrapes a half-written file.
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_text(content, encoding="utf-8")
+    tmp_path.replace(path)
+
+
+class ProgressReporter:
+    def __init__(
+        self,
+        metrics: RunMetrics,
+        metrics_file: Path | None = None,
+        progress: bool = False,
+        interval_sec: float = 5.0,
+        stream: TextIO | None = None,
+    ):
+        self.metrics = metrics
+        self.metrics_file = metrics_file
+        self.progress = progress
+        self.interval_sec = max(0.5, interval_sec)
+        self.stream = stream or sys.stderr
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_lines: list[str] = []
+        self._last_state: list[Any] = []
+
+    def __enter__(self) -> ProgressReporter:
+        self._thread = threading.Thread(target=self._loop, name="progress-reporter", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.tick(final=True)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            self.tick()
+
+    def tick(self, final: bool = False) -> None:
+        snapshot = self.metrics.snapshot()
+        if self.metrics_file is not None:
+            write_metrics_file(self.metrics_file, snapshot)
+        if not self.progress:
+            return
+        lines = status_lines(snapshot)
+        # Log files only get a new block when something other than a timer changed.
+        state = [snapshot["iterations"], [(item["challenge"], item["phase"]) for item in snapshot["active"]]]
+        if self.stream.isatty():
+            # Redraw the block in place: move up over the previous lines and clear them.
+            if self._last_lines:
+                self.stream.write(f"\x1b[{len(self._last_lines)}F\x1b[J")
+            self.stream.write("\n".join(lines) + "\n")
+        elif state != self._last_state or final:
+            self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+        self._last_lines = lines
+        self._last_state = state
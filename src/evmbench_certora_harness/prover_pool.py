@@ -0,0 +1,530 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import runpy
+import shlex
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+_SHELL_TOKENS = {"&&", "||", ";", "|", ">", ">>", "<", "&"}
+
+
+@dataclass
+class PoolOutcome:
+    exit_code: int
+    stdout: str
+    stderr: str
+    timed_out: bool
+
+
+class PoolError(RuntimeError):
+    pass
+
+
+class _JobLost(PoolError):
+    def __init__(self, message: str, job_pid: int | None):
+        super().__init__(message)
+        self.job_pid = job_pid
+
+
+# Worker side: `python -m evmbench_certora_harness.prover_pool` speaks JSON lines on
+# stdin/stdout. Job output never touches the protocol stream.
+
+
+def _capture_setup_env(setup_command: str | None) -> dict[str, str]:
+    env = dict(os.environ)
+    if not setup_command:
+        return env
+    proc = subprocess.run(
+        ["/bin/bash", "-c", f"{setup_command}\nenv -0"],
+        capture_output=True,
+        stdin=subprocess.DEVNULL,
+        check=False,
+        env=env,
+    )
+    if proc.returncode != 0:
+        raise PoolError(f"Pool setup command failed: {proc.stderr.decode('utf-8', errors='ignore')}")
+    captured: dict[str, str] = {}
+    for item in proc.stdout.split(b"\0"):
+        if b"=" in item:
+            key, value = item.split(b"=", 1)
+            captured[key.decode("utf-8", errors="ignore")] = value.decode("utf-8", errors="ignore")
+    return captured
+
+
+def _preload_scripts(scripts: list[str]) -> set[str]:
+    loaded: set[str] = set()
+    for script in scripts:
+        path = str(Path(script).expanduser().resolve())
+        script_dir = str(Path(path).parent)
+        if script_dir not in sys.path:
+            sys.path.insert(0, script_dir)
+        try:
+            # Executes imports and definitions only; `if __name__ == "__main__"` stays dormant.
+            runpy.run_path(path, run_name="__evmbench_preload__")
+        except BaseException:  # noqa: BLE001 - a broken preload just disables the fork path
+            traceback.print_exc(file=sys.stderr)
+            continue
+        loaded.add(path)
+    return loaded
+
+
+def _preloaded_argv(command: str, cwd: str, preloaded: set[str]) -> list[str] | None:
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if len(argv) < 2 or not Path(argv[0]).name.startswith("python"):
+        return None
+    if any(token in _SHELL_TOKENS for token in argv):
+        return None
+    script = str((Path(cwd) / Path(argv[1]).expanduser()).resolve())
+    if script not in preloaded:
+        return None
+    return [script, *argv[2:]]
+
+
+def _wait_child(pid: int, timeout_sec: float) -> tuple[int, bool]:
+    deadline = time.time() + timeout_sec
+    while True:
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            return os.waitstatus_to_exitcode(status), False
+        if time.time() >= deadline:
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            os.waitpid(pid, 0)
+            return 124, True
+        time.sleep(0.05)
+
+
+def _kill_group(pid: int | None) -> None:
+    if pid is None:
+        return
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _run_forked(
+    argv: list[str],
+    cwd: str,
+    env: dict[str, str],
+    timeout_sec: float,
+    on_start: Callable[[int], None],
+) -> PoolOutcome:
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                os.setsid()
+                devnull = os.open(os.devnull, os.O_RDONLY)
+                os.dup2(devnull, 0)
+                os.dup2(out.fileno(), 1)
+                os.dup2(err.fileno(), 2)
+                sys.stdout = open(1, "w", encoding="utf-8", errors="replace", closefd=False)
+                os.chdir(cwd)
+                os.environ.clear()
+                os.environ.update(env)
+                sys.argv = list(argv)
+                sys.path[0] = str(Path(argv[0]).parent)
+                try:
+                    runpy.run_path(argv[0], run_name="__main__")
+                    code = 0
+                except SystemExit as exc:
+                    if exc.code is None or isinstance(exc.code, int):
+                        code = exc.code or 0
+                    else:
+                        print(exc.code, file=sys.stderr)
+                        code = 1
+                except BaseException:  # noqa: BLE001 - reported through stderr like the interpreter would
+                    traceback.print_exc()
+                    code = 1
+            finally:
+                try:
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+                finally:
+                    os._exit(code)
+
+        on_start(pid)
+        exit_code, timed_out = _wait_child(pid, timeout_sec)
+        out.seek(0)
+        err.seek(0)
+        return PoolOutcome(
+            exit_code=exit_code,
+            stdout=out.read().decode("utf-8", errors="ignore"),
+            stderr=err.read().decode("utf-8", errors="ignore"),
+            timed_out=timed_out,
+        )
+
+
+def _run_shell(
+    command: str,
+    cwd: str,
+    env: dict[str, str],
+    timeout_sec: float,
+    on_start: Callable[[int], None],
+) -> PoolOutcome:
+    # Own process group, like the forked path, so the harness can kill the whole job.
+    proc = subprocess.Popen(
+        command,
+        cwd=cwd,
+        shell=True,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env,
+        start_new_session=True,
+    )
+    on_start(proc.pid)
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout_sec)
+    except subprocess.TimeoutExpired:
+        _kill_group(proc.pid)
+        stdout, stderr = proc.communicate()
+        return PoolOutcome(exit_code=124, stdout=_as_text(stdout), stderr=_as_text(stderr), timed_out=True)
+    return PoolOutcome(exit_code=proc.returncode, stdout=stdout, stderr=stderr, timed_out=False)
+
+
+def _as_text(value: str | bytes | None) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="ignore")
+    return value
+
+
+def _job_env(base_env: dict[str, str], request: dict[str, Any]) -> dict[str, str]:
+    env = dict(base_env)
+    env.update(request.get("env", {}))
+    path_prefix = request.get("path_prefix")
+    if path_prefix:
+        env["PATH"] = f"{path_prefix}{base_env.get('PATH', '')}"
+    return env
+
+
+def worker_main() -> int:
+    protocol = sys.stdout
+    # Anything the preloaded modules print must not corrupt the protocol stream.
+    sys.stdout = sys.stderr
+
+    def _reply(payload: dict[str, Any]) -> None:
+        protocol.write(json.dumps(payload) + "\n")
+        protocol.flush()
+
+    hello = json.loads(sys.stdin.readline() or "{}")
+    try:
+        base_env = _capture_setup_env(hello.get("setup_command"))
+        preloaded = _preload_scripts(list(hello.get("preload", [])))
+    except PoolError as exc:
+        _reply({"ready": False, "error": str(exc)})
+        return 1
+    _reply({"ready": True, "pid": os.getpid(), "preloaded": sorted(preloaded)})
+
+    jobs = 0
+    for line in sys.stdin:
+        request = json.loads(line)
+        op = request.get("op")
+        if op == "ping":
+            _reply({"ok": True, "jobs": jobs})
+            continue
+        if op != "run":
+            _reply({"ok": False, "error": f"unknown op {op!r}"})
+            continue
+
+        start = time.time()
+        env = _job_env(base_env, request)
+        cwd = str(request["cwd"])
+        timeout_sec = float(request["timeout_sec"])
+        argv = _preloaded_argv(str(request["command"]), cwd, preloaded) if hasattr(os, "fork") else None
+
+        def _started(pid: int) -> None:
+            _reply({"started": True, "job_pid": pid})
+
+        if argv is not None:
+            outcome = _run_forked(argv, cwd, env, timeout_sec, _started)
+        else:
+            outcome = _run_shell(str(request["command"]), cwd, env, timeout_sec, _started)
+        jobs += 1
+        _reply(
+            {
+                "ok": True,
+                "exit_code": outcome.exit_code,
+                "stdout": outcome.stdout,
+                "stderr": outcome.stderr,
+                "timed_out": outcome.timed_out,
+                "forked": argv is not None,
+                "elapsed_sec": time.time() - start,
+            }
+        )
+    return 0
+
+
+# Harness side.
+
+
+class _WorkerHandle:
+    def __init__(self, setup_command: str | None, preload: list[str], startup_timeout: float):
+        package_parent = str(Path(__file__).resolve().parent.parent)
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_parent, env.get("PYTHONPATH")]))
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "evmbench_certora_harness.prover_pool"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            env=env,
+        )
+        self.jobs = 0
+        # A reader thread instead of select(): readline() may buffer a second reply that
+        # select() on the pipe would then never report.
+        self._lines: queue.Queue[str | None] = queue.Queue()
+        threading.Thread(target=self._read_lines, name="prover-worker-reader", daemon=True).start()
+        self._send({"setup_command": setup_command, "preload": preload})
+        hello = self._recv(startup_timeout)
+        if not hello.get("ready"):
+            self.close()
+            raise PoolError(f"Prover worker failed to start: {hello.get('error', 'unknown error')}")
+
+    def _send(self, payload: dict[str, Any]) -> None:
+        assert self.proc.stdin is not None
+        self.proc.stdin.write(json.dumps(payload) + "\n")
+        self.proc.stdin.flush()
+
+    def _read_lines(self) -> None:
+        assert self.proc.stdout is not None
+        for line in self.proc.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def _recv(self, timeout_sec: float) -> dict[str, Any]:
+        try:
+            line = self._lines.get(timeout=timeout_sec)
+        except queue.Empty:
+            raise PoolError(f"Prover worker did not answer within {timeout_sec:.0f}s") from None
+        if line is None:
+            self._lines.put(None)
+            raise PoolError("Prover worker exited")
+        return json.loads(line)
+
+    def healthy(self, timeout_sec: float) -> bool:
+        if self.proc.poll() is not None:
+            return False
+        try:
+            self._send({"op": "ping"})
+            return bool(self._recv(timeout_sec).get("ok"))
+        except (OSError, PoolError, ValueError):
+            return False
+
+    def run(self, request: dict[str, Any], timeout_sec: float) -> dict[str, Any]:
+        self._send({"op": "run", **request})
+        # From here on the job may be running; failures must not lead to a second run.
+        job_pid = None
+        try:
+            reply = self._recv(timeout_sec)
+            if reply.get("started"):
+                job_pid = reply.get("job_pid")
+                reply = self._recv(timeout_sec)
+        except (OSError, PoolError, ValueError) as exc:
+            raise _JobLost(str(exc), job_pid) from exc
+        self.jobs += 1
+        return reply
+
+    def close(self) -> None:
+        if self.proc.poll() is None:
+            try:
+                assert self.proc.stdin is not None
+                self.proc.stdin.close()
+                self.proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.proc.kill()
+                self.proc.wait()
+
+
+class ProverPool:
+    def __init__(
+        self,
+        size: int = 2,
+        max_jobs_per_worker: int = 20,
+        setup_command: str | None = None,
+        preload: list[str] | None = None,
+        health_timeout_sec: float = 10.0,
+        startup_timeout_sec: float = 120.0,
+    ):
+        self.size = max(1, size)
+        self.max_jobs_per_worker = max(1, max_jobs_per_worker)
+        self.setup_command = setup_command
+        self.preload = list(preload or [])
+        self.health_timeout_sec = health_timeout_sec
+        self.startup_timeout_sec = startup_timeout_sec
+        self._idle: queue.Queue[_WorkerHandle | None] = queue.Queue()
+        for _ in range(self.size):
+            # Placeholders are replaced by live workers on first use.
+            self._idle.put(None)
+        self._all: set[_WorkerHandle] = set()
+        self._lock = threading.Lock()
+        self._warm_started = False
+        atexit.register(self.close)
+
+    def _spawn(self) -> _WorkerHandle:
+        handle = _WorkerHandle(self.setup_command, self.preload, self.startup_timeout_sec)
+        with self._lock:
+            self._all.add(handle)
+        return handle
+
+    def _retire(self, handle: _WorkerHandle) -> None:
+        handle.close()
+        with self._lock:
+            self._all.discard(handle)
+
+    def warm_up_async(self) -> None:
+        with self._lock:
+            if self._warm_started:
+                return
+            self._warm_started = True
+        # Spawning runs the setup command and preloads; keep it off the first job's path.
+        threading.Thread(target=self.warm_up, name="prover-pool-warmup", daemon=True).start()
+
+    def warm_up(self) -> None:
+        handles = []
+        for _ in range(self.size):
+            handle = self._idle.get()
+            try:
+                handles.append(handle or self._spawn())
+            except PoolError:
+                handles.append(None)
+        for handle in handles:
+            self._idle.put(handle)
+
+    def run(
+        self,
+        command: str,
+        cwd: Path,
+        timeout_sec: int,
+        env: dict[str, str] | None = None,
+    ) -> PoolOutcome | None:
+        handle = self._idle.get()
+        try:
+            if handle is not None and not handle.healthy(self.health_timeout_sec):
+                self._retire(handle)
+                handle = None
+            if handle is None:
+                handle = self._spawn()
+
+            reply = handle.run(
+                {"command": command, "cwd": str(cwd), "timeout_sec": timeout_sec, **_env_overrides(env)},
+                # The worker enforces the job timeout itself; allow time to collect output.
+                timeout_sec=timeout_sec + 60,
+            )
+            if handle.jobs >= self.max_jobs_per_worker:
+                self._retire(handle)
+                handle = None
+        except _JobLost as exc:
+            # The job was handed over and may still be running under its own session.
+            _kill_group(exc.job_pid)
+            self._retire(handle)
+            self._idle.put(None)
+            return PoolOutcome(
+                exit_code=124,
+                stdout="",
+                stderr=f"Prover pool lost the job: {exc}",
+                timed_out=True,
+            )
+        except (OSError, PoolError, ValueError):
+            if handle is not None:
+                self._retire(handle)
+            self._idle.put(None)
+            return None
+
+        self._idle.put(handle)
+        if not reply.get("ok"):
+            return None
+        return PoolOutcome(
+            exit_code=int(reply["exit_code"]),
+            stdout=str(reply["stdout"]),
+            stderr=str(reply["stderr"]),
+            timed_out=bool(reply["timed_out"]),
+        )
+
+    def fallback_env(self, env: dict[str, str] | None) -> dict[str, str] | None:
+        # Commands written for the pool rely on the setup exports; rebuild them the way a worker would.
+        if not self.setup_command:
+            return env
+        try:
+            return _job_env(_capture_setup_env(self.setup_command), _env_overrides(env))
+        except (OSError, PoolError):
+            return env
+
+    def close(self) -> None:
+        with self._lock:
+            handles = list(self._all)
+            self._all.clear()
+        for handle in handles:
+            handle.close()
+
+
+def _env_overrides(env: dict[str, str] | None) -> dict[str, Any]:
+    # Workers keep the environment captured by the setup command; only forward what the
+    # harness changed on top of its own environment (e.g. compile-cache shims).
+    if env is None:
+        return {}
+    current = os.environ
+    overrides = {key: value for key, value in env.items() if current.get(key) != value}
+    out: dict[str, Any] = {}
+    path = overrides.pop("PATH", None)
+    if path is not None:
+        base_path = current.get("PATH", "")
+        if base_path and path.endswith(base_path):
+            out["path_prefix"] = path[: len(path) - len(base_path)]
+        else:
+            overrides["PATH"] = path
+    out["env"] = overrides
+    return out
+
+
+_POOLS: dict[tuple[Any, ...], ProverPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(
+    size: int,
+    max_jobs_per_worker: int,
+    setup_command: str | None,
+    preload: list[str],
+) -> ProverPool:
+    key = (size, max_jobs_per_worker, setup_command, tuple(preload))
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = ProverPool(
+                size=size,
+                max_jobs_per_worker=max_jobs_per_worker,
+                setup_command=setup_command,
+                preload=preload,
+            )
+            _POOLS[key] = pool
+        return pool
+
+
+if __name__ == "__main__":
+    raise SystemExit(worker_main())
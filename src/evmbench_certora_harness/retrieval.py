@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import secrets
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .artifacts import read_iteration_file
+from .certora import is_broken_spec_output
+from .cvl import spec_fingerprint
+
+INDEX_VERSION = 1
+
+_FUNCTION_RE = re.compile(r"\bfunction\s+([A-Za-z_]\w*)\s*\(([^)]*)\)")
+_CONTRACT_RE = re.compile(r"\b(?:contract|interface|library)\s+([A-Za-z_]\w*)")
+_WORD_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+_VIOLATION_RE = re.compile(r"\bviolat", re.IGNORECASE)
+_SKIP_PARTS = {".store", ".solc_cache", "workspace", "node_modules", ".git"}
+
+
+@dataclass
+class SpecEntry:
+    challenge: str
+    run_dir: str
+    iteration: int
+    outcome: str
+    spec: str
+    spec_hash: str
+    signatures: list[str] = field(default_factory=list)
+    tokens: list[str] = field(default_factory=list)
+
+
+@dataclass
+class SpecMatch:
+    entry: SpecEntry
+    score: float
+
+
+def _param_types(params: str) -> str:
+    types = []
+    for param in params.split(","):
+        words = param.split()
+        if words:
+            types.append(words[0])
+    return ",".join(types)
+
+
+def _split_words(name: str) -> list[str]:
+    return [word.lower() for word in _WORD_RE.findall(name) if len(word) > 1]
+
+
+def contract_features(challenge_dir: Path, max_files: int = 400) -> tuple[list[str], list[str]]:
+    signatures: set[str] = set()
+    tokens: set[str] = set()
+    sources = [
+        path
+        for path in sorted(challenge_dir.rglob("*.sol"))
+        if not _SKIP_PARTS.intersection(path.relative_to(challenge_dir).parts)
+    ]
+    for path in sources[:max_files]:
+        text = path.read_text(encoding="utf-8", errors="ignore")
+        for name, params in _FUNCTION_RE.findall(text):
+            signatures.add(f"{name}({_param_types(params)})")
+            tokens.update(_split_words(name))
+        for name in _CONTRACT_RE.findall(text):
+            tokens.update(_split_words(name))
+    return sorted(signatures), sorted(tokens)
+
+
+def _jaccard(left: set[str], right: set[str]) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def _iteration_outcome(iter_dir: Path, item: dict[str, Any]) -> str | None:
+    status = item.get("certora_status")
+    if status == "success":
+        return "verified"
+    if status != "failure":
+        return None
+    log = read_iteration_file(iter_dir, "certora.log") or ""
+    if _VIOLATION_RE.search(log) and not is_broken_spec_output(log):
+        return "violated"
+    return None
+
+
+def _find_summaries(output_dir: Path) -> list[Path]:
+    found: list[Path] = []
+    for root, dirs, files in os.walk(output_dir):
+        # Iteration directories hold workspace copies; never descend into them.
+        dirs[:] = [name for name in dirs if name not in _SKIP_PARTS and not name.startswith("iter_")]
+        if "summary.json" in files:
+            found.append(Path(root) / "summary.json")
+    return sorted(found)
+
+
+class SpecIndex:
+    def __init__(self, index_path: Path, output_dir: Path):
+        self.index_path = index_path
+        self.output_dir = output_dir
+        self.entries: list[SpecEntry] = []
+        self._runs: dict[str, float] = {}
+        self._features: dict[str, tuple[list[str], list[str]]] = {}
+        self._lock = threading.Lock()
+        self._refreshed = False
+        self._load()
+
+    def _load(self) -> None:
+        if not self.index_path.is_file():
+            return
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        self._runs = {str(key): float(value) for key, value in data.get("runs", {}).items()}
+        self.entries = [SpecEntry(**item) for item in data.get("entries", [])]
+
+    def save(self) -> None:
+        payload = {
+            "version": INDEX_VERSION,
+            "runs": self._runs,
+            "entries": [asdict(entry) for entry in self.entries],
+        }
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        # Workers sharing an output_dir save concurrently, so each writer needs its own temp file.
+        tmp_path = self.index_path.with_name(
+            f".{self.index_path.name}.{os.getpid()}.{secrets.token_hex(4)}.tmp"
+        )
+        try:
+            tmp_path.write_text(json.dumps(payload, ensure_ascii=False) + "\n", encoding="utf-8")
+            tmp_path.replace(self.index_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _challenge_features(self, challenge: str) -> tuple[list[str], list[str]]:
+        if challenge not in self._features:
+            challenge_dir = Path(challenge)
+            features = contract_features(challenge_dir) if challenge_dir.is_dir() else ([], [])
+            self._features[challenge] = features
+        return self._features[challenge]
+
+    def ensure_refreshed(self) -> None:
+        if not self._refreshed:
+            self.refresh()
+
+    def refresh(self, rebuild: bool = False) -> int:
+        with self._lock:
+            self._refreshed = True
+            if rebuild:
+                self.entries = []
+                self._runs = {}
+            known_hashes = {entry.spec_hash for entry in self.entries}
+            added = 0
+            changed = rebuild
+            for summary_path in _find_summaries(self.output_dir):
+                run_dir = str(summary_path.parent)
+                mtime = summary_path.stat().st_mtime
+                if self._runs.get(run_dir) == mtime:
+                    continue
+                self._runs[run_dir] = mtime
+                changed = True
+                try:
+                    summary = json.loads(summary_path.read_text(encoding="utf-8"))
+                except json.JSONDecodeError:
+                    continue
+                for entry in self._entries_from_summary(summary_path.parent, summary):
+                    if entry.spec_hash in known_hashes:
+                        continue
+                    known_hashes.add(entry.spec_hash)
+                    self.entries.append(entry)
+                    added += 1
+            if changed:
+                try:
+                    self.save()
+                except OSError:
+                    # The index is only a cache; the next refresh rebuilds whatever was not saved.
+                    pass
+            return added
+
+    def _entries_from_summary(self, run_dir: Path, summary: dict[str, Any]) -> list[SpecEntry]:
+        challenge = str(summary.get("challenge", ""))
+        entries: list[SpecEntry] = []
+        for item in summary.get("iterations", []):
+            if item.get("prover_skipped"):
+                continue
+            iter_dir = run_dir / f"iter_{int(item.get('index', 0)):02d}"
+            outcome = _iteration_outcome(iter_dir, item)
+            if outcome is None:
+                continue
+            parsed = read_iteration_file(iter_dir, "llm_parsed.json")
+            if not parsed:
+                continue
+            try:
+                spec = str(json.loads(parsed).get("spec", "")).strip()
+            except json.JSONDecodeError:
+                continue
+            if not spec:
+                continue
+            signatures, tokens = self._challenge_features(challenge)
+            entries.append(
+                SpecEntry(
+                    challenge=challenge,
+                    run_dir=str(run_dir),
+                    iteration=int(item.get("index", 0)),
+                    outcome=outcome,
+                    spec=spec,
+                    spec_hash=spec_fingerprint(spec),
+                    signatures=signatures,
+                    tokens=tokens,
+                )
+            )
+        return entries
+
+    def query(
+        self,
+        challenge_dir: Path,
+        top_k: int = 2,
+        min_score: float = 0.1,
+        exclude_same_challenge: bool = True,
+    ) -> list[SpecMatch]:
+        signatures, tokens = contract_features(challenge_dir)
+        wanted_signatures = set(signatures)
+        wanted_tokens = set(tokens)
+        own = str(challenge_dir.resolve())
+
+        best: dict[str, SpecMatch] = {}
+        with self._lock:
+            entries = list(self.entries)
+        for entry in entries:
+            if exclude_same_challenge and entry.challenge == own:
+                continue
+            score = 0.6 * _jaccard(wanted_signatures, set(entry.signatures)) + 0.4 * _jaccard(
+                wanted_tokens, set(entry.tokens)
+            )
+            # Prefer specs that fully verified over ones that only exposed a violation.
+            score += 0.05 if entry.outcome == "verified" else 0.0
+            if score < min_score:
+                continue
+            current = best.get(entry.challenge)
+            if current is None or score > current.score:
+                # One seed per source challenge keeps the examples diverse.
+                best[entry.challenge] = SpecMatch(entry=entry, score=score)
+        ranked = sorted(best.values(), key=lambda match: match.score, reverse=True)
+        return ranked[:top_k]
+
+
+def render_seed_specs(matches: list[SpecMatch], max_spec_chars: int) -> str:
+    chunks: list[str] = []
+    for match in matches:
+        spec = match.entry.spec
+        if len(spec) > max_spec_chars:
+            spec = f"{spec[:max_spec_chars]}\n// ... truncated"
+        chunks.append(
+            f"### REFERENCE SPEC ({match.entry.outcome}, similarity={match.score:.2f}, "
+            f"from {Path(match.entry.challenge).name})\n{spec}\n"
+        )
+    return "\n".join(chunks)
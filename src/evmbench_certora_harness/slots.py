@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class FairSlots:
+    def __init__(self, slots: int):
+        self.slots = max(1, slots)
+        self._free = self.slots
+        self._cond = threading.Condition()
+        self._waiting: dict[str, deque[object]] = {}
+        self._order: list[str] = []
+
+    def _next_ticket(self) -> object | None:
+        for owner in self._order:
+            tickets = self._waiting.get(owner)
+            if tickets:
+                return tickets[0]
+        return None
+
+    @contextmanager
+    def acquire(self, owner: str) -> Iterator[None]:
+        ticket = object()
+        with self._cond:
+            if owner not in self._waiting:
+                self._waiting[owner] = deque()
+                self._order.append(owner)
+            self._waiting[owner].append(ticket)
+            while not (self._free > 0 and self._next_ticket() is ticket):
+                self._cond.wait()
+            self._waiting[owner].popleft()
+            self._free -= 1
+            # Round-robin: the owner just served goes to the back of the line.
+            self._order.remove(owner)
+            self._order.append(owner)
+            self._cond.notify_all()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._free += 1
+                self._cond.notify_all()
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+
+@dataclass
+class Job:
+    id: int
+    challenge: str
+    config_path: str
+    options: dict[str, Any]
+    attempts: int
+    worker_id: str | None = None
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    challenge TEXT NOT NULL,
+    config_path TEXT NOT NULL,
+    options_json TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'queued',
+    worker_id TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result_json TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, id);
+"""
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    def __init__(self, path: str | Path, lease_sec: int = 1800, max_attempts: int = 3):
+        self.path = Path(path).expanduser().resolve()
+        self.lease_sec = lease_sec
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Network filesystems do not support WAL reliably; stay on the rollback journal.
+        conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def enqueue(self, challenge: str, config_path: str, options: dict[str, Any] | None = None) -> int:
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (challenge, config_path, options_json, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (challenge, config_path, json.dumps(options or {}), now, now),
+            )
+            return int(cursor.lastrowid)
+
+    def requeue_expired(self) -> int:
+        now = time.time()
+        with self._transaction() as conn:
+            return self._requeue_expired(conn, now)
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now: float) -> int:
+        failed = conn.execute(
+            "UPDATE jobs SET status = 'failed', worker_id = NULL, lease_expires = NULL, "
+            "error = 'lease expired after max attempts', updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+            (now, now, self.max_attempts),
+        ).rowcount
+        requeued = conn.execute(
+            "UPDATE jobs SET status = 'queued', worker_id = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ?",
+            (now, now),
+        ).rowcount
+        return failed + requeued
+
+    def lease(self, worker_id: str) -> Job | None:
+        now = time.time()
+        with self._transaction() as conn:
+            self._requeue_expired(conn, now)
+            row = conn.execute(
+                "SELECT id, challenge, config_path, options_json, attempts FROM jobs "
+                "WHERE status = 'queued' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'leased', worker_id = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (worker_id, now + self.lease_sec, now, row[0]),
+            )
+        return Job(
+            id=int(row[0]),
+            challenge=str(row[1]),
+            config_path=str(row[2]),
+            options=json.loads(row[3] or "{}"),
+            attempts=int(row[4]) + 1,
+            worker_id=worker_id,
+        )
+
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (now + self.lease_sec, now, job_id, worker_id),
+            ).rowcount
+        return updated == 1
+
+    def complete(self, job_id: int, worker_id: str, result: dict[str, Any]) -> bool:
+        return self._finish(job_id, worker_id, "done", result_json=json.dumps(result), error=None)
+
+    def fail(self, job_id: int, worker_id: str, error: str) -> bool:
+        return self._finish(job_id, worker_id, "failed", result_json=None, error=error)
+
+    def _finish(
+        self,
+        job_id: int,
+        worker_id: str,
+        status: str,
+        result_json: str | None,
+        error: str | None,
+    ) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            # A worker whose lease was reassigned must not overwrite the new owner's job.
+            updated = conn.execute(
+                "UPDATE jobs SET status = ?, result_json = ?, error = ?, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'leased'",
+                (status, result_json, error, now, job_id, worker_id),
+            ).rowcount
+        return updated == 1
+
+    def counts(self) -> dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        out = {"queued": 0, "leased": 0, "done": 0, "failed": 0}
+        out.update({str(status): int(count) for status, count in rows})
+        return out
+
+    def results(self, job_ids: list[int] | None = None) -> list[dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, challenge, status, result_json, error, worker_id, attempts FROM jobs ORDER BY id"
+            ).fetchall()
+        wanted = set(job_ids) if job_ids is not None else None
+        out: list[dict[str, Any]] = []
+        for job_id, challenge, status, result_json, error, worker_id, attempts in rows:
+            if wanted is not None and job_id not in wanted:
+                continue
+            out.append(
+                {
+                    "job_id": job_id,
+                    "challenge": challenge,
+                    "job_status": status,
+                    "result": json.loads(result_json) if result_json else None,
+                    "error": error,
+                    "worker_id": worker_id,
+                    "attempts": attempts,
+                }
+            )
+        return out
+
+
+class _LeaseKeeper:
+    def __init__(self, queue: WorkQueue, job: Job, worker_id: str):
+        self.queue = queue
+        self.job = job
+        self.worker_id = worker_id
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def __enter__(self) -> "_LeaseKeeper":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _loop(self) -> None:
+        interval = max(1.0, self.queue.lease_sec / 3)
+        while not self._stop.wait(interval):
+            try:
+                self.queue.heartbeat(self.job.id, self.worker_id)
+            except sqlite3.Error:
+                # Transient lock contention on shared storage; the next beat retries.
+                continue
+
+
+def wait_for_jobs(
+    queue: WorkQueue,
+    job_ids: list[int],
+    poll_interval: float = 10.0,
+    on_finished: Callable[[dict[str, Any]], None] | None = None,
+) -> list[dict[str, Any]]:
+    reported: set[int] = set()
+    while True:
+        queue.requeue_expired()
+        rows = queue.results(job_ids)
+        for row in rows:
+            if row["job_status"] in {"done", "failed"} and row["job_id"] not in reported:
+                reported.add(row["job_id"])
+                if on_finished is not None:
+                    on_finished(row)
+        if len(reported) >= len(job_ids):
+            return rows
+        time.sleep(poll_interval)
+
+
+def run_worker(
+    queue: WorkQueue,
+    execute: Callable[[Job], dict[str, Any]],
+    worker_id: str | None = None,
+    poll_interval: float = 10.0,
+    max_jobs: int | None = None,
+    exit_when_idle: bool = False,
+) -> int:
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        job = queue.lease(worker_id)
+        if job is None:
+            if exit_when_idle:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        with _LeaseKeeper(queue, job, worker_id):
+            try:
+                result = execute(job)
+            except Exception as exc:  # noqa: BLE001 - any crash is reported back to the coordinator
+                queue.fail(job.id, worker_id, f"{type(exc).__name__}: {exc}")
+            else:
+                queue.complete(job.id, worker_id, result)
+        processed += 1
+    return processed
@@ -0,0 +1,149 @@
+import json
+from pathlib import Path
+
+from evmbench_certora_harness import llm
+from evmbench_certora_harness.agent import HarnessRunner
+from evmbench_certora_harness.config import load_config
+from evmbench_certora_harness.convergence import ProgressObservation, ProgressTracker
+from evmbench_certora_harness.llm import BaseLLMClient, LLMResponse
+
+
+class _ScriptedClient(BaseLLMClient):
+    def __init__(self, specs: list[str]):
+        self.specs = list(specs)
+        self.prompts: list[str] = []
+        self.temperatures: list[float | None] = []
+
+    def complete_json(self, system_prompt: str, user_prompt: str, temperature=None, schema=None) -> LLMResponse:
+        self.prompts.append(user_prompt)
+        self.temperatures.append(temperature)
+        payload = {"spec_path": "specs/AutoSpec.cvl", "summary": "scripted", "spec": self.specs.pop(0)}
+        return LLMResponse(payload=payload, raw_text=json.dumps(payload))
+
+
+def _config(tmp_path: Path, command: str, extra: list[str] | None = None) -> Path:
+    config_path = tmp_path / "harness.yaml"
+    config_path.write_text(
+        "\n".join(
+            [
+                f"challenge_root: {Path('examples').resolve()}",
+                f"output_dir: {tmp_path / 'runs'}",
+                "max_iterations: 3",
+                "certora:",
+                f"  command_template: {json.dumps(command)}",
+                "  failure_markers: [VIOLATION]",
+                *(extra or []),
+            ]
+        )
+    )
+    return config_path
+
+
+def test_repeated_spec_skips_prover(tmp_path: Path) -> None:
+    counter = tmp_path / "prover_calls"
+    config = load_config(_config(tmp_path, f"echo run >> {counter} && echo VIOLATION"))
+    client = _ScriptedClient(
+        [
+            "rule a() { assert true; }\ninvariant b() true;",
+            "invariant b() true; // reordered\nrule a() {\n  assert true;\n}",
+            "rule a() { assert false; }",
+        ]
+    )
+    runner = HarnessRunner(config=config, llm_client=client)
+    summary = runner._run_single(Path("examples/sample_challenge").resolve())
+
+    iterations = summary["iterations"]
+    assert [item["prover_skipped"] for item in iterations] == [False, True, False]
+    assert iterations[1]["repeat_of"] == 1
+    assert counter.read_text().count("run") == 2
+    assert "REPEATED SPEC" in client.prompts[2]
+
+
+def test_oscillation_escalates_then_stagnates(tmp_path: Path) -> None:
+    extra = ["convergence:", "  enabled: true", "  escalate_temperature: 0.9"]
+    config = load_config(_config(tmp_path, "echo VIOLATION", extra))
+    client = _ScriptedClient([f"rule r{idx % 2}() {{ assert false; }}" for idx in range(8)])
+    runner = HarnessRunner(config=config, llm_client=client, max_iterations_override=8)
+    summary = runner._run_single(Path("examples/sample_challenge").resolve())
+
+    assert summary["status"] == "stagnated"
+    assert [event["action"] for event in summary["progress_events"]] == ["escalate", "stop"]
+    assert len(summary["iterations"]) == 6
+    assert client.temperatures[:3] == [None, None, None]
+    assert client.temperatures[3:] == [0.9, 0.9, 0.9]
+    assert "Previous spec:\nnone" in client.prompts[3]
+
+
+class _RawClient(BaseLLMClient):
+    def __init__(self, replies: list[str]):
+        self.replies = list(replies)
+        self.prompts: list[str] = []
+        self.schemas: list[dict | None] = []
+
+    def complete_json(self, system_prompt: str, user_prompt: str, temperature=None, schema=None) -> LLMResponse:
+        self.prompts.append(user_prompt)
+        self.schemas.append(schema)
+        payload, repairs = llm._json_load_with_fallback(self.replies.pop(0))
+        return LLMResponse(payload=payload, raw_text="", repairs=repairs)
+
+
+def test_missing_spec_is_reasked_without_prover_run(tmp_path: Path) -> None:
+    counter = tmp_path / "prover_calls"
+    config = load_config(_config(tmp_path, f"echo run >> {counter} && echo VIOLATION"))
+    client = _RawClient(
+        [
+            '{"spec_path": "specs/AutoSpec.cvl", "summary": "forgot the spec"}',
+            '{"spec": "rule a() {\n  assert true;\n}"}',
+            "I cannot answer that.",
+            "still not json",
+            '{"spec": "rule b() { assert false; }"}',
+        ]
+    )
+    runner = HarnessRunner(config=config, llm_client=client, max_iterations_override=3)
+    summary = runner._run_single(Path("examples/sample_challenge").resolve())
+
+    iterations = summary["iterations"]
+    assert [item["certora_status"] for item in iterations] == ["failure", "llm-parse-error", "failure"]
+    assert iterations[0]["llm_reasks"] == 1
+    assert "Context files" not in client.prompts[1]
+    assert client.schemas[0] is None
+    assert client.schemas[1]["required"] == ["spec"]
+    assert counter.read_text().count("run") == 2
+    assert "INVALID RESPONSE" in client.prompts[4]
+
+
+def test_unusable_responses_reach_stagnated(tmp_path: Path) -> None:
+    extra = ["convergence:", "  enabled: true", "  action: stop", "llm:", "  reask_attempts: 0"]
+    config = load_config(_config(tmp_path, "echo VIOLATION", extra))
+    client = _RawClient(["no json here"] * 8)
+    runner = HarnessRunner(config=config, llm_client=client, max_iterations_override=8)
+    summary = runner._run_single(Path("examples/sample_challenge").resolve())
+
+    assert summary["status"] == "stagnated"
+    assert len(summary["iterations"]) == 3
+    assert {item["certora_status"] for item in summary["iterations"]} == {"llm-parse-error"}
+
+
+def test_tracker_flags_return_to_an_earlier_spec() -> None:
+    tracker = ProgressTracker(patience=5, cycle_window=4)
+    signatures = ["timeout", "violation", "other"]
+    events = [
+        tracker.observe(ProgressObservation(idx, spec, "failure", signatures[idx], 0, 0, True))
+        for idx, spec in enumerate(["spec-a", "spec-b", "spec-a"])
+    ]
+    assert events == [None, None, "cycle"]
+
+
+def test_repeated_timeout_is_rerun_and_reported_as_such(tmp_path: Path) -> None:
+    counter = tmp_path / "prover_calls"
+    config = load_config(_config(tmp_path, f"echo run >> {counter} && sleep 5", ["  timeout_sec: 1"]))
+    client = _ScriptedClient(["invariant b() true;"] * 3)
+    runner = HarnessRunner(config=config, llm_client=client)
+    summary = runner._run_single(Path("examples/sample_challenge").resolve())
+
+    iterations = summary["iterations"]
+    assert [item["prover_skipped"] for item in iterations[:2]] == [False, False]
+    assert iterations[1]["repeat_of"] == 1
+    assert counter.read_text().count("run") == len(iterations)
+    assert "re-run because the last attempt timed out" in client.prompts[2]
+    assert "not re-run" not in client.prompts[2]
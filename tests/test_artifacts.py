@@ -0,0 +1,41 @@
+import json
+import random
+from pathlib import Path
+
+from evmbench_certora_harness.artifacts import (
+    ArtifactStore,
+    archive_iteration,
+    materialize_iteration,
+    read_iteration_file,
+)
+
+
+def _prompt(context: str, feedback: str) -> str:
+    return json.dumps({"system_prompt": "sys", "user_prompt": f"Feedback:\n{feedback}\n\n{context}"})
+
+
+def test_archive_dedupes_repeated_prompt_context(tmp_path: Path) -> None:
+    rng = random.Random(7)
+    context = "".join(rng.choice("abcdefgh ;{}\n") for _ in range(300_000))
+    store = ArtifactStore(tmp_path / "store", compression="gzip")
+
+    manifests = []
+    for idx, feedback in enumerate(["parse error at line 3", "rule r1 violated"], start=1):
+        iter_dir = tmp_path / f"iter_{idx:02d}"
+        (iter_dir / "workspace" / "contracts").mkdir(parents=True)
+        (iter_dir / "workspace" / "contracts" / "Vault.sol").write_text("contract Vault {}\n")
+        (iter_dir / "workspace" / "lib.sol").write_text(context[:200_000])
+        (iter_dir / "prompt.json").write_text(_prompt(context, feedback))
+        manifests.append(archive_iteration(store, iter_dir))
+        assert not (iter_dir / "workspace").exists()
+        assert not (iter_dir / "prompt.json").exists()
+
+    first, second = (set(m["files"]["prompt.json"]["chunks"]) for m in manifests)
+    assert len(first & second) >= len(first) - 2
+    assert manifests[0]["workspace"] == manifests[1]["workspace"]
+    assert len(manifests[0]["workspace"]["lib.sol"]["chunks"]) == 1
+
+    dest = materialize_iteration(store, tmp_path / "iter_02", tmp_path / "restored")
+    assert (dest / "prompt.json").read_text() == _prompt(context, "rule r1 violated")
+    assert (dest / "workspace" / "contracts" / "Vault.sol").read_text() == "contract Vault {}\n"
+    assert read_iteration_file(tmp_path / "iter_01", "workspace/contracts/Vault.sol") == "contract Vault {}\n"
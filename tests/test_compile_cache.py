@@ -0,0 +1,60 @@
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+from evmbench_certora_harness.compile_cache import CompileCache, read_stats, source_hash
+
+_FAKE_SOLC = """#!/bin/sh
+if [ "$1" = "--version" ]; then echo "solc, fake 0.8.20"; exit 0; fi
+echo compile >> "{calls}"
+mkdir -p "$3"
+echo "{{\\"source\\": \\"$PWD/src/Vault.sol\\"}}" > "$3/Vault.json"
+echo "compiled $PWD/src/Vault.sol"
+"""
+
+
+def _compile(env: dict[str, str], workspace: Path) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        ["solc", "src/Vault.sol", "-o", str(workspace / "out")],
+        cwd=workspace,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_shim_misses_then_hits_across_workspaces(tmp_path: Path, monkeypatch) -> None:
+    bin_dir = tmp_path / "realbin"
+    bin_dir.mkdir()
+    calls = tmp_path / "calls"
+    (bin_dir / "solc").write_text(_FAKE_SOLC.format(calls=calls))
+    (bin_dir / "solc").chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    first = tmp_path / "iter_01" / "workspace"
+    (first / "src").mkdir(parents=True)
+    (first / "src" / "Vault.sol").write_text("contract Vault {}\n")
+    second = tmp_path / "iter_02" / "workspace"
+    shutil.copytree(first, second)
+
+    cache = CompileCache(tmp_path / "cache", solc_names=["solc"])
+    stats = []
+    outputs = []
+    for workspace in (first, second):
+        stats_file = workspace.parent / "solc_cache.jsonl"
+        env = cache.prepare(workspace, stats_file=stats_file)
+        outputs.append(_compile(env, workspace))
+        stats.append(read_stats(stats_file))
+
+    assert stats == [{"hits": 0, "misses": 1}, {"hits": 1, "misses": 0}]
+    assert calls.read_text().count("compile") == 1
+    # Replayed output points at the second workspace, not the one that was compiled.
+    assert outputs[1].stdout == f"compiled {second.resolve()}/src/Vault.sol\n"
+    assert str(second.resolve()) in (second / "out" / "Vault.json").read_text()
+
+    (second / "node_modules" / "dep").mkdir(parents=True)
+    before = source_hash(second)
+    (second / "node_modules" / "dep" / "Lib.sol").write_text("library Lib {}\n")
+    assert source_hash(second) != before
@@ -0,0 +1,60 @@
+import os
+from pathlib import Path
+
+from evmbench_certora_harness.agent import HarnessRunner
+from evmbench_certora_harness.config import load_config
+from evmbench_certora_harness.corpus import CorpusManifest
+from evmbench_certora_harness.llm import BaseLLMClient
+
+
+def _touch_later(path: Path) -> None:
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+
+
+def test_manifest_refreshes_incrementally_and_sorts_by_size(tmp_path: Path) -> None:
+    root = tmp_path / "audits"
+    for name, size in [("alpha", 10), ("beta", 500), ("gamma", 50)]:
+        (root / name / "src").mkdir(parents=True)
+        (root / name / "src" / "Vault.sol").write_text("x" * size)
+    manifest_path = tmp_path / "corpus.json"
+
+    manifest = CorpusManifest(manifest_path, root, "*")
+    assert manifest.refresh() == 3
+    assert [record.id for record in manifest.select(sort="size")] == ["beta", "gamma", "alpha"]
+    assert [record.id for record in manifest.select(min_bytes=40)] == ["beta", "gamma"]
+
+    saved = manifest_path.stat().st_mtime_ns
+    reloaded = CorpusManifest(manifest_path, root, "*")
+    assert reloaded.refresh() == 0
+    assert manifest_path.stat().st_mtime_ns == saved
+    old_hash = reloaded.records["alpha"].content_hash
+
+    (root / "alpha" / "notes.md").write_text("more")
+    _touch_later(root / "alpha")
+    (root / "delta").mkdir()
+    _touch_later(root)
+    assert reloaded.refresh() == 2
+    assert reloaded.records["alpha"].file_count == 2
+    assert reloaded.records["alpha"].content_hash != old_hash
+    assert reloaded.lookup("delta") is not None
+
+
+def test_resolving_one_challenge_does_not_scan_the_corpus(tmp_path: Path) -> None:
+    config_path = tmp_path / "harness.yaml"
+    config_path.write_text(
+        "\n".join(
+            [
+                f"challenge_root: {Path('examples').resolve()}",
+                f"output_dir: {tmp_path / 'runs'}",
+                "corpus:",
+                "  enabled: true",
+            ]
+        )
+    )
+    runner = HarnessRunner(config=load_config(config_path), llm_client=BaseLLMClient(), dry_run=True)
+
+    assert runner.discover_challenges(specific_challenge=Path("sample_challenge")) == [
+        Path("examples/sample_challenge").resolve()
+    ]
+    assert not (tmp_path / "runs" / ".corpus.json").exists()
@@ -0,0 +1,36 @@
+from evmbench_certora_harness.cvl import normalize_spec, spec_fingerprint
+
+SPEC = """
+methods {
+    function balanceOf(address) external returns (uint256) envfree;
+}
+
+// Owner may never change.
+rule ownerStable(method f) filtered { f -> !f.isView } {
+    env e; calldataarg args;
+    address before = owner();
+    f(e, args);
+    assert owner() == before, "owner changed";
+}
+
+invariant supplyNonNegative() totalSupply() >= 0;
+"""
+
+REORDERED = """
+invariant supplyNonNegative()
+    totalSupply()>=0;
+/* moved the rule up */
+rule ownerStable(method f) filtered { f -> !f.isView } { env e; calldataarg args;
+  address before = owner(); f(e, args); assert owner() == before, "owner changed"; }
+methods { function balanceOf(address) external returns (uint256) envfree; }
+"""
+
+
+def test_fingerprint_ignores_comments_whitespace_and_order() -> None:
+    assert spec_fingerprint(SPEC) == spec_fingerprint(REORDERED)
+    assert len(normalize_spec(SPEC).splitlines()) == 3
+
+
+def test_fingerprint_keeps_semantic_changes() -> None:
+    assert spec_fingerprint(SPEC) != spec_fingerprint(SPEC.replace(">= 0", "> 0"))
+    assert spec_fingerprint(SPEC) != spec_fingerprint(SPEC.replace('"owner changed"', '"owner  changed"'))
@@ -0,0 +1,70 @@
+import threading
+
+from evmbench_certora_harness import llm
+from evmbench_certora_harness.config import LLMConfig
+
+
+class _Response:
+    status_code = 200
+
+    def __init__(self, content: str):
+        self._content = content
+
+    def json(self):
+        return {"message": {"content": self._content}}
+
+
+def test_ollama_sizes_context_and_spreads_endpoints(monkeypatch) -> None:
+    calls = []
+    gate = threading.Barrier(2)
+
+    def _fake_post(url, json=None, timeout=None):
+        calls.append((url, json))
+        if len(calls) <= 2:
+            # Hold both concurrent requests in flight so each must pick a different endpoint.
+            gate.wait(timeout=5)
+        return _Response('{"spec": "invariant t() true;"}')
+
+    monkeypatch.setattr(llm.requests, "post", _fake_post)
+    client = llm.OllamaClient(
+        LLMConfig(
+            provider="ollama",
+            model="qwen2.5-coder:14b",
+            max_output_tokens=1800,
+            endpoints=["http://gpu-a:11434", "http://gpu-b:11434"],
+            warmup=False,
+        )
+    )
+
+    threads = [
+        threading.Thread(target=client.complete_json, args=("sys", "x" * 120_000)) for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert {url for url, _ in calls} == {"http://gpu-a:11434/api/chat", "http://gpu-b:11434/api/chat"}
+    options = calls[0][1]["options"]
+    assert options["num_ctx"] == 65536
+    assert options["num_predict"] == 1800
+    assert calls[0][1]["keep_alive"] == "30m"
+
+    response = client.complete_json("sys", "short")
+    assert calls[-1][1]["options"]["num_ctx"] == 65536
+    assert response.warnings == []
+
+    # ~220 KB of context exceeds the 64K cap; the truncation must be reported.
+    response = client.complete_json("sys", "x" * 220_000)
+    assert calls[-1][1]["options"]["num_ctx"] == 65536
+    assert "truncated" in response.warnings[0]
+
+
+def test_json_repair_handles_raw_newlines_commas_and_truncation() -> None:
+    payload, repairs = llm._json_load_with_fallback('```json\n{"spec": "rule a() {\n  assert true;\n}",}\n```')
+    assert payload == {"spec": "rule a() {\n  assert true;\n}"}
+    assert repairs == ["escaped control characters in strings", "removed trailing commas"]
+
+    payload, repairs = llm._json_load_with_fallback('{"spec_path": "specs/A.cvl", "spec": "rule a() { ass')
+    assert payload["spec"] == "rule a() { ass"
+    assert "spec" in llm.payload_problems(payload, repairs)
@@ -0,0 +1,67 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from evmbench_certora_harness.config import LLMConfig, load_config
+from evmbench_certora_harness.llm import BaseLLMClient, LLMResponse
+from evmbench_certora_harness.matrix import build_llm_configs, parse_llm_override, render_table, run_matrix
+
+
+class _FixedClient(BaseLLMClient):
+    def complete_json(self, system_prompt: str, user_prompt: str) -> LLMResponse:
+        payload = {"spec_path": "specs/AutoSpec.cvl", "summary": "fixed", "spec": "invariant t() true;"}
+        return LLMResponse(payload=payload, raw_text=json.dumps(payload))
+
+
+def test_parse_llm_override_keeps_model_tags() -> None:
+    assert parse_llm_override("ollama:qwen2.5-coder:14b") == {"provider": "ollama", "model": "qwen2.5-coder:14b"}
+    base = LLMConfig(provider="ollama", model="x", base_url="http://gpu-box:11434")
+    openai, ollama = build_llm_configs(base, [{"provider": "openai", "model": "gpt-5-mini"}, {"model": "y"}])
+    assert openai.base_url is None
+    assert ollama.base_url == "http://gpu-box:11434"
+
+
+def test_parse_llm_override_key_value_types() -> None:
+    override = parse_llm_override(
+        "provider=ollama,model=qwen2.5-coder:14b,structured_output=false,warmup=false,"
+        "temperature=0.4,endpoints=http://a:11434;http://b:11434"
+    )
+    (config,) = build_llm_configs(LLMConfig(), [override])
+    assert config.model == "qwen2.5-coder:14b"
+    assert config.structured_output is False
+    assert config.warmup is False
+    assert config.temperature == 0.4
+    assert config.endpoints == ["http://a:11434", "http://b:11434"]
+
+
+@pytest.mark.parametrize("parallel", [1, 2])
+def test_matrix_shares_prover_results_across_models(tmp_path: Path, parallel: int) -> None:
+    counter = tmp_path / "prover_calls"
+    config_path = tmp_path / "harness.yaml"
+    config_path.write_text(
+        "\n".join(
+            [
+                f"challenge_root: {Path('examples').resolve()}",
+                f"output_dir: {tmp_path / 'runs'}",
+                "max_iterations: 2",
+                "certora:",
+                f"  command_template: {json.dumps(f'echo run >> {counter} && sleep 0.3 && echo VIOLATION')}",
+                "  failure_markers: [VIOLATION]",
+            ]
+        )
+    )
+    config = load_config(config_path)
+    llm_configs = build_llm_configs(config.llm, [{"provider": "mock", "model": "a"}, {"provider": "mock", "model": "b"}])
+
+    rows = run_matrix(
+        config=config,
+        llm_configs=llm_configs,
+        challenges=[Path("examples/sample_challenge").resolve()],
+        parallel=parallel,
+        client_factory=lambda llm: _FixedClient(),
+    )
+
+    assert [row["model"] for row in rows] == ["mock-a", "mock-b"]
+    assert counter.read_text().count("run") == 1
+    assert "0/1" in render_table(rows)
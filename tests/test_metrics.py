@@ -0,0 +1,36 @@
+from evmbench_certora_harness.metrics import RunMetrics, percentile, render_prometheus, status_lines
+
+
+def test_run_metrics_aggregates_iterations_and_active_phases() -> None:
+    metrics = RunMetrics()
+    metrics("run_start", {"total": 3})
+    metrics("challenge_start", {"challenge": "vault", "label": None, "max_iterations": 4})
+    metrics("challenge_start", {"challenge": "curves", "label": "ollama-qwen", "max_iterations": 4})
+    metrics("phase", {"challenge": "curves", "label": "ollama-qwen", "phase": "prover", "iteration": 2})
+    for llm_sec, elapsed, skipped in [(2.0, 100.0, False), (4.0, 0.0, True), (6.0, 300.0, False)]:
+        result = {
+            "certora_status": "failure",
+            "llm_sec": llm_sec,
+            "elapsed_sec": elapsed,
+            "prover_skipped": skipped,
+            "compile_cache_hits": 1,
+            "compile_cache_misses": 1,
+            "prompt_tokens": 1000,
+            "completion_tokens": 200,
+        }
+        metrics("iteration", {"challenge": "vault", "label": None, "result": result})
+    metrics("challenge_end", {"challenge": "vault", "label": None, "status": "stagnated"})
+
+    snapshot = metrics.snapshot()
+    assert snapshot["challenges"] == {"total": 3, "done": 1, "active": 1, "queued": 1}
+    assert snapshot["llm_latency_sec"]["p50"] == 4.0
+    assert snapshot["prover_latency_sec"]["p90"] == 300.0
+    assert snapshot["cache"]["prover_hit_rate"] == round(1 / 3, 4)
+    assert snapshot["tokens"] == {"prompt": 3000, "completion": 600}
+    assert snapshot["active"][0]["challenge"] == "curves [ollama-qwen]"
+
+    text = render_prometheus(snapshot)
+    assert 'evmbench_challenge_status_total{status="stagnated"} 1' in text
+    assert 'evmbench_active_phase_seconds{challenge="curves [ollama-qwen]",phase="prover"}' in text
+    assert "curves [ollama-qwen]: it 2/4 prover" in status_lines(snapshot)[1]
+    assert percentile([], 0.9) == 0.0
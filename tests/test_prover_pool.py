@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from evmbench_certora_harness.certora import run_certora
+from evmbench_certora_harness.prover_pool import PoolError, ProverPool
+
+SCRIPT = """
+import os
+import threading
+import time
+import sys
+
+if __name__ == "__main__":
+    print("token", os.environ.get("POOL_TOKEN"), sys.argv[1:])
+    if "--fail" in sys.argv:
+        raise SystemExit(3)
+    print("VERIFICATION SUCCESSFUL")
+"""
+
+
+def _gone(pid: int) -> bool:
+    # The orphaned job is reparented to init; an unreaped zombie counts as killed.
+    try:
+        with open(f"/proc/{pid}/stat") as handle:
+            return handle.read().rsplit(")", 1)[1].split()[0] == "Z"
+    except FileNotFoundError:
+        return True
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork-server path is POSIX only")
+def test_warm_pool_runs_preloaded_script_and_recycles(tmp_path: Path) -> None:
+    script = tmp_path / "certoraRun.py"
+    script.write_text(SCRIPT)
+    pool = ProverPool(
+        size=1,
+        max_jobs_per_worker=2,
+        setup_command="export POOL_TOKEN=warm",
+        preload=[str(script)],
+    )
+    try:
+        results = [
+            run_certora(
+                command=f"python3 {script} {arg}",
+                cwd=tmp_path,
+                timeout_sec=30,
+                success_markers=["VERIFICATION SUCCESSFUL"],
+                failure_markers=["FAILED"],
+                pool=pool,
+            )
+            for arg in ["--ok", "--fail", "--ok"]
+        ]
+    finally:
+        pool.close()
+
+    assert [item.status for item in results] == ["success", "failure", "success"]
+    assert results[1].exit_code == 3
+    assert "token warm ['--ok']" in results[2].stdout
+
+
+@pytest.mark.skipif(not Path("/proc").is_dir(), reason="checks process state through /proc")
+def test_job_lost_after_dispatch_is_killed_not_rerun(tmp_path: Path) -> None:
+    pid_file = tmp_path / "job.pid"
+    pool = ProverPool(size=1)
+    pool.warm_up()
+    outcome = []
+    runner = threading.Thread(
+        target=lambda: outcome.append(
+            pool.run(command=f"echo $$ > {pid_file}; exec sleep 30", cwd=tmp_path, timeout_sec=60)
+        )
+    )
+    runner.start()
+    deadline = time.time() + 10
+    while not pid_file.exists() or not pid_file.read_text().strip():
+        assert time.time() < deadline
+        time.sleep(0.05)
+    job_pid = int(pid_file.read_text())
+    (worker,) = list(pool._all)
+    worker.proc.kill()
+    runner.join(timeout=10)
+    pool.close()
+
+    assert outcome[0] is not None and outcome[0].timed_out
+    time.sleep(0.2)
+    assert _gone(job_pid)
+
+
+def test_fallback_keeps_pool_setup_env(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    def _broken_spawn(self: ProverPool) -> None:
+        raise PoolError("cannot start worker")
+
+    monkeypatch.setattr(ProverPool, "_spawn", _broken_spawn)
+    pool = ProverPool(size=1, setup_command="export POOL_TOKEN=warm")
+    result = run_certora(
+        command='test "$POOL_TOKEN" = warm && echo VERIFICATION SUCCESSFUL',
+        cwd=tmp_path,
+        timeout_sec=30,
+        success_markers=["VERIFICATION SUCCESSFUL"],
+        failure_markers=["FAILED"],
+        pool=pool,
+    )
+
+    assert result.status == "success"
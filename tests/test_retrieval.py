@@ -0,0 +1,88 @@
+import json
+import threading
+from pathlib import Path
+
+from evmbench_certora_harness.retrieval import SpecIndex
+
+VAULT = """
+contract Vault {
+    function deposit(uint256 amount) external {}
+    function withdraw(uint256 amount) external {}
+    function balanceOf(address owner) external view returns (uint256) {}
+}
+"""
+
+OWNABLE = """
+contract Security {
+    function transferOwnership(address newOwner) external {}
+    function setManager(address manager, bool enabled) external {}
+}
+"""
+
+
+def _past_run(output_dir: Path, challenge: Path, spec: str, status: str, log: str) -> None:
+    run_dir = output_dir / challenge.name / "20250101_000000"
+    iter_dir = run_dir / "iter_01"
+    iter_dir.mkdir(parents=True)
+    (iter_dir / "llm_parsed.json").write_text(json.dumps({"spec": spec}))
+    (iter_dir / "certora.log").write_text(log)
+    summary = {
+        "challenge": str(challenge),
+        "status": status,
+        "iterations": [{"index": 1, "certora_status": "success" if status == "success" else "failure"}],
+    }
+    (run_dir / "summary.json").write_text(json.dumps(summary))
+
+
+def test_index_ranks_similar_contracts(tmp_path: Path) -> None:
+    corpus = tmp_path / "audits"
+    for name, source in [("vault-a", VAULT), ("curves", OWNABLE), ("vault-b", VAULT.replace("Vault", "Pool"))]:
+        (corpus / name).mkdir(parents=True)
+        (corpus / name / "Main.sol").write_text(source)
+
+    output_dir = tmp_path / "runs"
+    _past_run(output_dir, corpus / "vault-a", "rule depositIncreases() { assert true; }", "success", "ok")
+    _past_run(output_dir, corpus / "curves", "rule onlyOwner() { assert true; }", "max-iterations", "Violated")
+    _past_run(output_dir, corpus / "vault-b", "rule broken( {", "max-iterations", "Syntax error; Violated")
+
+    index = SpecIndex(tmp_path / "index.json", output_dir)
+    assert index.refresh() == 2
+    assert index.refresh() == 0
+
+    matches = index.query(corpus / "vault-b", top_k=2)
+    assert [match.entry.outcome for match in matches] == ["verified"]
+    assert "depositIncreases" in matches[0].entry.spec
+    reloaded = SpecIndex(tmp_path / "index.json", output_dir)
+    assert sorted(entry.outcome for entry in reloaded.entries) == ["verified", "violated"]
+
+
+def test_concurrent_refreshes_share_one_index(tmp_path: Path) -> None:
+    challenge = tmp_path / "audits" / "vault-a"
+    challenge.mkdir(parents=True)
+    (challenge / "Main.sol").write_text(VAULT)
+    output_dir = tmp_path / "runs"
+    _past_run(output_dir, challenge, "rule depositIncreases() { assert true; }", "success", "ok")
+
+    index_path = tmp_path / "index.json"
+    barrier = threading.Barrier(8)
+    errors: list[BaseException] = []
+
+    def _refresh() -> None:
+        index = SpecIndex(index_path, output_dir)
+        barrier.wait()
+        try:
+            index.refresh()
+        except BaseException as exc:  # noqa: BLE001 - surfaced by the assertion below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=_refresh) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert [path.name for path in tmp_path.iterdir() if path.name.endswith(".tmp")] == []
+    saved = index_path.stat().st_mtime_ns
+    assert SpecIndex(index_path, output_dir).refresh() == 0
+    assert index_path.stat().st_mtime_ns == saved
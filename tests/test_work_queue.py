@@ -0,0 +1,37 @@
+import time
+from pathlib import Path
+
+from evmbench_certora_harness.work_queue import WorkQueue, run_worker
+
+
+def test_lease_complete_and_expiry(tmp_path: Path) -> None:
+    queue = WorkQueue(tmp_path / "queue.sqlite", lease_sec=1)
+    first = queue.enqueue("/audits/a", "/cfg.yaml", {"dry_run": True})
+    second = queue.enqueue("/audits/b", "/cfg.yaml")
+
+    job = queue.lease("w1")
+    assert job is not None and job.id == first and job.options == {"dry_run": True}
+    assert queue.complete(job.id, "w1", {"status": "success"})
+
+    crashed = queue.lease("w2")
+    assert crashed is not None and crashed.id == second
+    time.sleep(1.1)
+
+    retried = queue.lease("w3")
+    assert retried is not None and retried.id == second and retried.attempts == 2
+    assert not queue.complete(second, "w2", {"status": "stale"})
+    assert queue.complete(second, "w3", {"status": "failure"})
+    assert queue.counts()["done"] == 2
+
+
+def test_run_worker_reports_failures(tmp_path: Path) -> None:
+    queue = WorkQueue(tmp_path / "queue.sqlite")
+    queue.enqueue("/audits/a", "/cfg.yaml")
+
+    def _boom(job):
+        raise ValueError("bad config")
+
+    assert run_worker(queue, execute=_boom, worker_id="w", exit_when_idle=True) == 1
+    (row,) = queue.results()
+    assert row["job_status"] == "failed"
+    assert "bad config" in row["error"]